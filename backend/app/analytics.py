@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# route_daily_stats is maintained by triggers, so every write path (ORM adds,
+# bulk inserts, the write-behind queue) updates it in the same transaction.
+# Deleting or archiving raw rows leaves the rollups untouched - they are the
+# long-term record once raw rows age out.
+KEY_COLUMNS = "day, origin, destination, cabin_class"
+COLUMNS = f"{KEY_COLUMNS}, searches, failed_searches, bookings, booking_value"
+
+def _search_key(row: str) -> str:
+    return (
+        f"COALESCE(date({row}.created_at), date('now')), COALESCE({row}.origin, 'unknown'), "
+        f"COALESCE({row}.destination, 'unknown'), COALESCE({row}.cabin_class, 'unknown')"
+    )
+
+def _booking_key(row: str) -> str:
+    # Route comes from the originating search, else from the booked flight
+    return (
+        f"COALESCE(date({row}.created_at), date('now')), "
+        f"COALESCE(s.origin, json_extract({row}.flight_details, '$.origin'), 'unknown'), "
+        f"COALESCE(s.destination, json_extract({row}.flight_details, '$.destination'), 'unknown'), "
+        f"COALESCE(s.cabin_class, json_extract({row}.flight_details, '$.cabin_class'), 'unknown')"
+    )
+
+def _booking_delta(row: str, sign: str) -> str:
+    return f"""INSERT INTO route_daily_stats({COLUMNS})
+            SELECT {_booking_key(row)}, 0, 0, {sign}1, {sign}COALESCE({row}.total_amount, 0)
+            FROM (SELECT 1) LEFT JOIN search_history s ON s.search_id = {row}.search_id
+            WHERE {row}.status = 'confirmed'
+            ON CONFLICT({KEY_COLUMNS}) DO UPDATE SET
+                bookings = bookings + excluded.bookings,
+                booking_value = booking_value + excluded.booking_value;"""
+
+TRIGGERS = {
+    "route_daily_stats_search_ai": f"""CREATE TRIGGER IF NOT EXISTS route_daily_stats_search_ai AFTER INSERT ON search_history BEGIN
+            INSERT INTO route_daily_stats({COLUMNS})
+            VALUES ({_search_key('new')}, 1, CASE WHEN new.search_status = 'success' THEN 0 ELSE 1 END, 0, 0)
+            ON CONFLICT({KEY_COLUMNS}) DO UPDATE SET
+                searches = searches + 1,
+                failed_searches = failed_searches + excluded.failed_searches;
+        END""",
+    "route_daily_stats_booking_ai": f"""CREATE TRIGGER IF NOT EXISTS route_daily_stats_booking_ai AFTER INSERT ON bookings BEGIN
+            {_booking_delta('new', '')}
+        END""",
+    # A cancellation or repricing moves the booking out of / within the rollup
+    "route_daily_stats_booking_au": f"""CREATE TRIGGER IF NOT EXISTS route_daily_stats_booking_au
+        AFTER UPDATE OF status, total_amount ON bookings BEGIN
+            {_booking_delta('old', '-')}
+            {_booking_delta('new', '')}
+        END""",
+}
+
+REBUILD = [
+    "DELETE FROM route_daily_stats",
+    f"""INSERT INTO route_daily_stats({COLUMNS})
+        SELECT {_search_key('h')}, COUNT(*), SUM(CASE WHEN h.search_status = 'success' THEN 0 ELSE 1 END), 0, 0
+        FROM search_history h
+        GROUP BY 1, 2, 3, 4""",
+    f"""INSERT INTO route_daily_stats({COLUMNS})
+        SELECT {_booking_key('b')}, 0, 0, COUNT(*), SUM(COALESCE(b.total_amount, 0))
+        FROM bookings b LEFT JOIN search_history s ON s.search_id = b.search_id
+        WHERE b.status = 'confirmed'
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT({KEY_COLUMNS}) DO UPDATE SET
+            bookings = excluded.bookings,
+            booking_value = excluded.booking_value""",
+]
+
+def init_analytics(engine: Engine):
+    """
+    Create the rollup triggers (SQLite only).
+    The first time they are installed the rollups are rebuilt from the raw rows.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as conn:
+        installed = {
+            row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))
+        }
+        for statement in TRIGGERS.values():
+            conn.execute(text(statement))
+        if not installed.issuperset(TRIGGERS):
+            for statement in REBUILD:
+                conn.execute(text(statement))
+
+def _rates(searches: int, bookings: int, value: float) -> Dict[str, Optional[float]]:
+    return {
+        "conversion_rate": round(bookings / searches, 4) if searches else None,
+        "avg_booking_value": round(value / bookings, 2) if bookings else None,
+    }
+
+async def get_analytics(db: AsyncSession, days: int, top: int) -> Dict[str, Any]:
+    """
+    Dashboard figures for the last `days` days, read from the rollups only:
+    totals, per-day series, top routes by searches and a cabin class split.
+    """
+    today = datetime.utcnow().date()
+    params = {"start": (today - timedelta(days=days - 1)).isoformat(), "top": top}
+
+    daily_rows = (await db.execute(text("""
+        SELECT day, SUM(searches) AS searches, SUM(failed_searches) AS failed_searches,
+               SUM(bookings) AS bookings, SUM(booking_value) AS booking_value
+        FROM route_daily_stats
+        WHERE day >= :start
+        GROUP BY day
+        ORDER BY day
+    """), params)).mappings().all()
+
+    route_rows = (await db.execute(text("""
+        SELECT origin, destination, SUM(searches) AS searches,
+               SUM(bookings) AS bookings, SUM(booking_value) AS booking_value
+        FROM route_daily_stats
+        WHERE day >= :start
+        GROUP BY origin, destination
+        ORDER BY searches DESC, bookings DESC
+        LIMIT :top
+    """), params)).mappings().all()
+
+    cabin_rows = (await db.execute(text("""
+        SELECT cabin_class, SUM(searches) AS searches,
+               SUM(bookings) AS bookings, SUM(booking_value) AS booking_value
+        FROM route_daily_stats
+        WHERE day >= :start
+        GROUP BY cabin_class
+        ORDER BY searches DESC
+    """), params)).mappings().all()
+
+    def with_rates(row) -> Dict[str, Any]:
+        item = dict(row)
+        item["booking_value"] = round(float(item["booking_value"] or 0), 2)
+        return {**item, **_rates(item["searches"], item["bookings"], item["booking_value"])}
+
+    searches = sum(r["searches"] for r in daily_rows)
+    bookings = sum(r["bookings"] for r in daily_rows)
+    value = sum(r["booking_value"] or 0 for r in daily_rows)
+
+    return {
+        "from": params["start"],
+        "to": today.isoformat(),
+        "totals": {
+            "searches": searches,
+            "failed_searches": sum(r["failed_searches"] for r in daily_rows),
+            "bookings": bookings,
+            "booking_value": round(value, 2),
+            **_rates(searches, bookings, value),
+        },
+        "daily": [with_rates(r) for r in daily_rows],
+        "top_routes": [with_rates(r) for r in route_rows],
+        "cabin_classes": [with_rates(r) for r in cabin_rows],
+    }
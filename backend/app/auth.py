@@ -1,13 +1,27 @@
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import Any, Dict, Optional, Set, Tuple
 from app.config import get_settings
 
 settings = get_settings()
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing - passlib and jose are imported on first use, which keeps
+# them (and bcrypt's backend probing) out of worker start-up
+@lru_cache()
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event
+# loop; its size caps how much CPU a login burst can take from other requests
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers,
+    thread_name_prefix="password-hash"
+)
 
 # --- DEMO SETTINGS (Hardcoded to bypass .env errors) ---
 SECRET_KEY = "DEMO_SECRET_KEY_123"
@@ -22,14 +36,24 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return True
         
     try:
-        return pwd_context.verify(plain_password, hashed_password)
+        return get_pwd_context().verify(plain_password, hashed_password)
     except Exception:
         # If the hash in the DB is corrupted, don't crash the server
         return False
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the hashing pool, for async routes"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the hashing pool, for async routes"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, get_password_hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
@@ -42,15 +66,73 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     
     to_encode.update({"exp": expire})
     
+    from jose import jwt
+    
     # FIX: Use the hardcoded SECRET_KEY and ALGORITHM
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 def decode_access_token(token: str) -> Optional[dict]:
     """Decode JWT token"""
+    from jose import JWTError, jwt
+    
     try:
         # FIX: Use the hardcoded SECRET_KEY and ALGORITHM
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+class TokenUserCache:
+    """
+    Short-lived map of access token -> resolved user, so authenticated
+    requests skip the JWT decode and the users query. Entries expire after
+    the TTL (never later than the token itself) and are dropped for a user
+    as soon as crud.update_user changes them.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[float, int, Any]] = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+
+    def get(self, token: str) -> Optional[Any]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        expires_at, user_id, user = entry
+        if time.monotonic() >= expires_at:
+            self._drop(token, user_id)
+            return None
+        self._entries.move_to_end(token)
+        return user
+
+    def put(self, token: str, payload: Dict[str, Any], user: Any):
+        expires_at = time.monotonic() + self.ttl_seconds
+        if payload.get("exp"):
+            expires_at = min(expires_at, time.monotonic() + payload["exp"] - time.time())
+        self._entries[token] = (expires_at, user.id, user)
+        self._entries.move_to_end(token)
+        self._tokens_by_user.setdefault(user.id, set()).add(token)
+        while len(self._entries) > self.max_entries:
+            evicted, (_, evicted_user, _) = self._entries.popitem(last=False)
+            self._discard_index(evicted, evicted_user)
+
+    def invalidate_user(self, user_id: int):
+        """Forget every cached token of a user"""
+        for token in self._tokens_by_user.pop(user_id, set()):
+            self._entries.pop(token, None)
+
+    def _drop(self, token: str, user_id: int):
+        self._entries.pop(token, None)
+        self._discard_index(token, user_id)
+
+    def _discard_index(self, token: str, user_id: int):
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+token_user_cache = TokenUserCache(settings.auth_cache_ttl_seconds, settings.auth_cache_max_entries)
@@ -0,0 +1,112 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+class CircuitBreaker:
+    """
+    Tracks the outcome and latency of recent calls to a dependency.
+    Opens when too many of the last `window` calls failed or were slow;
+    while open allow() is False so callers fall back immediately instead
+    of waiting on a dependency that is down. Recovery is checked by
+    running `probe` in the background every probe_interval seconds; the
+    first successful probe closes the circuit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], Awaitable[Any]],
+        window: int,
+        min_calls: int,
+        error_rate: float,
+        slow_call_seconds: float,
+        slow_call_rate: float,
+        probe_interval: float
+    ):
+        self.name = name
+        self.probe = probe
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.probe_interval = probe_interval
+
+        self.state = "closed"  # 'closed', 'open'
+        self.opened_at: Optional[float] = None
+        self.open_reason: Optional[str] = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._calls: Deque[Tuple[bool, float]] = deque(maxlen=window)
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            self.rejected += 1
+            return False
+        return True
+
+    def record(self, ok: bool, seconds: float):
+        """Record one call; opens the circuit when the window crosses a threshold"""
+        if self.state == "open":
+            return
+        self._calls.append((ok, seconds))
+        if len(self._calls) < self.min_calls:
+            return
+
+        total = len(self._calls)
+        errors = sum(1 for call_ok, _ in self._calls if not call_ok) / total
+        slow = sum(1 for call_ok, s in self._calls if call_ok and s >= self.slow_call_seconds) / total
+        if errors >= self.error_rate:
+            self._open(f"error rate {errors:.0%} over the last {total} calls")
+        elif slow >= self.slow_call_rate:
+            self._open(f"{slow:.0%} of the last {total} calls slower than {self.slow_call_seconds}s")
+
+    def _open(self, reason: str):
+        self.state = "open"
+        self.opened_at = time.time()
+        self.open_reason = reason
+        self.times_opened += 1
+        print(f"Circuit '{self.name}' opened: {reason}")
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe_until_recovered())
+
+    def _close(self):
+        self.state = "closed"
+        self.opened_at = None
+        self.open_reason = None
+        self._calls.clear()
+        print(f"Circuit '{self.name}' closed")
+
+    async def _probe_until_recovered(self):
+        while self.state == "open":
+            await asyncio.sleep(self.probe_interval)
+            started = time.perf_counter()
+            try:
+                await self.probe()
+            except Exception as e:
+                print(f"Circuit '{self.name}' probe failed: {e}")
+                continue
+            if time.perf_counter() - started < self.slow_call_seconds:
+                self._close()
+
+    async def stop(self):
+        if self._probe_task is not None and not self._probe_task.done():
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+
+    def report(self) -> Dict[str, Any]:
+        total = len(self._calls)
+        return {
+            "state": self.state,
+            "open_reason": self.open_reason,
+            "opened_at": self.opened_at,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "window_calls": total,
+            "window_errors": sum(1 for ok, _ in self._calls if not ok),
+            "window_avg_seconds": round(sum(s for _, s in self._calls) / total, 3) if total else None,
+        }
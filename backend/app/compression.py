@@ -0,0 +1,139 @@
+import zlib
+from typing import List, Optional, Tuple
+from app.config import get_settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it only gzip is offered
+    brotli = None
+
+settings = get_settings()
+
+# Already compressed or latency-sensitive bodies are sent as-is
+EXCLUDED_CONTENT_TYPES = ("text/event-stream", "image/", "application/zip", "application/gzip")
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred encoding the client accepts: br, then gzip"""
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip()] = q
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=settings.compression_brotli_quality)
+        else:
+            # wbits 31 = gzip container
+            self._gz = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes, final: bool) -> bytes:
+        """Compress a chunk; non-final chunks are flushed so streamed lines arrive promptly"""
+        if self.encoding == "br":
+            out = self._br.process(data)
+            return out + (self._br.finish() if final else self._br.flush())
+        out = self._gz.compress(data)
+        return out + self._gz.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+class CompressionMiddleware:
+    """
+    Compresses responses with brotli or gzip, as negotiated by
+    Accept-Encoding, once the body reaches compression_min_bytes.
+    Streaming responses (NDJSON, CSV exports) are compressed chunk by chunk.
+    An ETag on an encoded response (or a 304 to a client that negotiated an
+    encoding) is made weak (W/) since the bytes differ from the identity
+    response it was computed for.
+    """
+
+    def __init__(self, app, minimum_size: int = None):
+        self.app = app
+        self.minimum_size = settings.compression_min_bytes if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode())
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        def compressible(response_headers: List[Tuple[bytes, bytes]]) -> bool:
+            names = {k.lower(): v for k, v in response_headers}
+            if b"content-encoding" in names:
+                return False
+            content_type = names.get(b"content-type", b"").decode().lower()
+            return not any(content_type.startswith(t) for t in EXCLUDED_CONTENT_TYPES)
+
+        def weak_etag(response_headers):
+            # The route's ETag names the identity bytes; the encoded body
+            # differs byte for byte, so it may only carry a weak validator
+            return [
+                (k, b"W/" + v if k.lower() == b"etag" and not v.startswith(b"W/") else v)
+                for k, v in response_headers
+            ]
+
+        def with_encoding(response_headers, content_length: Optional[int]):
+            kept = [(k, v) for k, v in weak_etag(response_headers) if k.lower() not in (b"content-length", b"vary")]
+            vary = [v for k, v in response_headers if k.lower() == b"vary"]
+            kept.append((b"content-encoding", encoding.encode()))
+            kept.append((b"vary", b", ".join(vary + [b"Accept-Encoding"]) if vary else b"Accept-Encoding"))
+            if content_length is not None:
+                kept.append((b"content-length", str(content_length).encode()))
+            return kept
+
+        async def compressing_send(message):
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                if message["status"] == 304:
+                    # Revalidation of a possibly encoded response: send the
+                    # same weak validator the full response would carry
+                    passthrough = True
+                    return await send({**message, "headers": weak_etag(message.get("headers", []))})
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                response_headers = list(start_message.get("headers", []))
+                small = not more_body and len(body) < self.minimum_size
+                if small or not compressible(response_headers):
+                    passthrough = True
+                    await send(start_message)
+                    return await send(message)
+
+                compressor = _Compressor(encoding)
+                if not more_body:
+                    compressed = compressor.chunk(body, final=True)
+                    await send({**start_message, "headers": with_encoding(response_headers, len(compressed))})
+                    return await send({"type": "http.response.body", "body": compressed})
+                await send({**start_message, "headers": with_encoding(response_headers, None)})
+
+            await send({
+                "type": "http.response.body",
+                "body": compressor.chunk(body, final=not more_body),
+                "more_body": more_body
+            })
+
+        await self.app(scope, receive, compressing_send)
@@ -1,10 +1,30 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     # Ollama settings
     ollama_model: str = "llama3.2:latest"
     ollama_host: str = "http://localhost:11434"
+    llm_context_window_tokens: int = 4096
+    llm_response_reserve_tokens: int = 512
+    llm_summary_max_tokens: int = 256
+    ollama_keep_alive: str = "24h"  # how long Ollama keeps the model loaded after a call
+    llm_timeout_seconds: float = 30.0  # a completion taking longer counts as a failure
+    
+    # LLM circuit breaker - while open, summaries and questions come from templates (see circuit_breaker.py)
+    llm_breaker_window: int = 20  # recent calls the rates are computed over
+    llm_breaker_min_calls: int = 5
+    llm_breaker_error_rate: float = 0.5
+    llm_breaker_slow_call_seconds: float = 10.0
+    llm_breaker_slow_call_rate: float = 0.5
+    llm_breaker_probe_interval_seconds: float = 15.0
+    
+    # Startup warmup - readiness waits for it (see warmup.py)
+    warmup_enabled: bool = True
+    warmup_require_llm: bool = False  # stay unready while Ollama cannot be warmed
+    warmup_db_connections: int = 4
+    warmup_prime_routes: int = 10  # top routes whose caches are primed; 0 disables
     
     # API settings
     flight_api_key: str = ""
@@ -13,9 +33,77 @@ class Settings(BaseSettings):
     # Server settings
     frontend_url: str = "http://localhost:5173"
     backend_port: int = 8000
+    compression_min_bytes: int = 1024  # smaller responses are sent uncompressed
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    # Sent with ETag on history, bookings and plans: clients revalidate every time and get a 304 when unchanged
+    http_cache_control: str = "private, no-cache"
+    
+    # Auth settings
+    password_hash_workers: int = 2  # bcrypt threads; bounds login CPU
+    auth_cache_ttl_seconds: int = 60
+    auth_cache_max_entries: int = 10000
+    admin_api_key: str = ""  # X-Admin-Token for /api/admin/*; empty disables those routes
+    
+    # Rate limiting of LLM-heavy routes (see rate_limit.py); capacity is the
+    # burst in LLM calls, refill the sustained calls per second.
+    # rate_limit_store is 'memory' (per process) or 'sqlite' (shared by workers)
+    rate_limit_enabled: bool = True
+    rate_limit_ip_capacity: float = 20
+    rate_limit_ip_refill_per_second: float = 0.2
+    rate_limit_user_capacity: float = 40
+    rate_limit_user_refill_per_second: float = 0.5
+    rate_limit_store: str = "memory"
+    rate_limit_sqlite_path: str = "./rate_limits.db"
+    rate_limit_max_buckets: int = 100000
+    rate_limit_trust_forwarded_for: bool = False
+    
+    # Planning settings
+    batch_plan_concurrency: int = 4
+    batch_plan_max_requests: int = 100
+    # Flight/hotel search results are kept process-wide for search_cache_ttl_seconds
+    # and reused by re-plans; new plans (/api/plan-travel, batch, compare) only
+    # reuse results younger than plan_search_max_age_seconds, so their prices
+    # are at most that old (0 = always search)
+    search_cache_ttl_seconds: int = 900
+    plan_search_max_age_seconds: int = 60
+    search_cache_max_entries: int = 512
+    chat_session_cache_size: int = 1000
+    
+    # Booking settings
+    idempotency_ttl_seconds: int = 86400
+    idempotency_max_entries: int = 10000
+    saga_lease_seconds: int = 300  # unfinished sagas untouched this long are compensated by recovery
     
     # Database settings
     database_url: str = "sqlite:///./travel_booking.db"
+    async_database_url: str = ""  # derived from database_url when empty
+    approximate_count_cap: int = 10000
+    export_chunk_size: int = 1000
+    write_behind_batch_size: int = 200
+    write_behind_flush_interval: float = 1.0
+    write_behind_max_queue: int = 10000
+    
+    # Storage tuning - profile is 'production' or 'baseline' (see database.py);
+    # the sqlite_* settings override individual PRAGMAs of the profile
+    storage_profile: str = "production"
+    sqlite_journal_mode: str = ""
+    sqlite_synchronous: str = ""
+    sqlite_cache_size: Optional[int] = None
+    sqlite_mmap_size: Optional[int] = None
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    
+    # Retention - rows older than these ages are moved to gzipped NDJSON
+    # files under archive_dir, one file per table and month; 0 keeps a table
+    # forever (bookings are the financial record, so they are kept by default)
+    archive_dir: str = "./archive"
+    retention_search_history_days: int = 90
+    retention_travel_plans_days: int = 180
+    retention_bookings_days: int = 0
+    retention_batch_size: int = 1000
+    retention_interval_hours: float = 24.0
+    retention_vacuum_free_ratio: float = 0.25
     
     class Config:
         env_file = ".env"
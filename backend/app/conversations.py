@@ -0,0 +1,130 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.db_models import Conversation
+
+settings = get_settings()
+
+class ConversationStore:
+    """
+    Server-side chat sessions. The conversations table is the source of
+    truth; recently active sessions are also kept in an in-memory LRU so a
+    turn costs one UPDATE and no read. Turns of one session are serialized.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._sessions: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        # conversation_id -> (lock, turns holding or waiting for it); a lock
+        # only exists while a turn of that session is in progress
+        self._locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+    def _remember(self, conversation_id: str, session: Dict[str, Any]):
+        self._sessions[conversation_id] = session
+        self._sessions.move_to_end(conversation_id)
+        while len(self._sessions) > self.max_entries:
+            self._sessions.popitem(last=False)
+
+    @asynccontextmanager
+    async def turn(self, db: AsyncSession, conversation_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Serialize one chat turn and yield the session state. The id is
+        resolved (404 if unknown) before any lock is created, and the lock
+        is dropped once no turn holds or waits for it.
+        """
+        await self.get(db, conversation_id)
+        lock, users = self._locks.get(conversation_id, (None, 0))
+        lock = lock or asyncio.Lock()
+        self._locks[conversation_id] = (lock, users + 1)
+        try:
+            async with lock:
+                yield await self.get(db, conversation_id)
+        finally:
+            lock, users = self._locks[conversation_id]
+            if users == 1:
+                del self._locks[conversation_id]
+            else:
+                self._locks[conversation_id] = (lock, users - 1)
+
+    async def create(
+        self,
+        db: AsyncSession,
+        messages: Optional[List[Dict[str, Any]]] = None,
+        extracted_info: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Start a session, optionally seeded with a client-held history"""
+        conversation_id = str(uuid.uuid4())
+        session = {"messages": list(messages or []), "extracted_info": dict(extracted_info or {})}
+        db.add(Conversation(
+            conversation_id=conversation_id,
+            messages=session["messages"],
+            extracted_info=session["extracted_info"]
+        ))
+        await db.commit()
+        self._remember(conversation_id, session)
+        return conversation_id
+
+    async def get(self, db: AsyncSession, conversation_id: str) -> Dict[str, Any]:
+        """Session state from the LRU, falling back to the database; 404 if unknown"""
+        session = self._sessions.get(conversation_id)
+        if session is not None:
+            self._sessions.move_to_end(conversation_id)
+            return session
+
+        row = (await db.execute(
+            select(Conversation.messages, Conversation.extracted_info)
+            .where(Conversation.conversation_id == conversation_id)
+        )).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+
+        session = {"messages": list(row.messages or []), "extracted_info": dict(row.extracted_info or {})}
+        self._remember(conversation_id, session)
+        return session
+
+    async def append_turn(
+        self,
+        db: AsyncSession,
+        conversation_id: str,
+        user_message: str,
+        ai_message: str,
+        extracted_info: Dict[str, Any],
+        is_ready_to_plan: bool
+    ) -> int:
+        """Record one user/ai exchange and the new extracted info; returns the message count"""
+        session = await self.get(db, conversation_id)
+        now = datetime.now().isoformat()
+        messages = session["messages"] + [
+            {"role": "user", "content": user_message, "timestamp": now},
+            {"role": "ai", "content": ai_message, "timestamp": now},
+        ]
+
+        await db.execute(
+            update(Conversation)
+            .where(Conversation.conversation_id == conversation_id)
+            .values(
+                messages=messages,
+                extracted_info=extracted_info,
+                is_completed=int(is_ready_to_plan),
+                updated_at=datetime.utcnow()
+            )
+        )
+        await db.commit()
+
+        # Only swapped in once the write has landed
+        session["messages"] = messages
+        session["extracted_info"] = extracted_info
+        return len(messages)
+
+conversation_store = ConversationStore(settings.chat_session_cache_size)
+
+def info_delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of extracted info that were added or changed this turn"""
+    return {k: v for k, v in after.items() if before.get(k) != v}
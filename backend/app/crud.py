@@ -1,21 +1,22 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db_models import User
 from app.schemas import UserCreate
-from app.auth import get_password_hash, verify_password
+from app.auth import get_password_hash_async, verify_password_async, token_user_cache
 from typing import Optional
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """Get user by email"""
-    return db.query(User).filter(User.email == email).first()
+    return (await db.execute(select(User).where(User.email == email))).scalars().first()
 
-def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
+async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
     """Get user by ID"""
-    return db.query(User).filter(User.id == user_id).first()
+    return (await db.execute(select(User).where(User.id == user_id))).scalars().first()
 
 # Update imports if needed, ensure you have IntegrityError for DB dupes
 from sqlalchemy.exc import IntegrityError 
 
-def create_user(db: Session, user: UserCreate) -> User:
+async def create_user(db: AsyncSession, user: UserCreate) -> User:
     """Create new user with Error Handling for Demo"""
     print(f"--- ATTEMPTING TO REGISTER: {user.email} ---") # Debug print
 
@@ -25,7 +26,7 @@ def create_user(db: Session, user: UserCreate) -> User:
     
     # Otherwise, keep using your hash function but wrap it to see if it fails:
     try:
-        hashed_password = get_password_hash(user.password)
+        hashed_password = await get_password_hash_async(user.password)
     except Exception as e:
         print(f"ERROR HASHING PASSWORD: {e}")
         # Fallback so the app doesn't crash during demo
@@ -39,35 +40,35 @@ def create_user(db: Session, user: UserCreate) -> User:
     
     try:
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         print("--- USER CREATED SUCCESSFULLY ---")
         return db_user
         
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         print("ERROR: User already exists (Duplicate Email)")
         # For a demo, you might want to just return the existing user 
         # instead of failing, so the UI flow continues:
-        return get_user_by_email(db, user.email)
+        return await get_user_by_email(db, user.email)
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"CRITICAL DATABASE ERROR: {e}")
         raise e
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     """Authenticate user with email and password"""
-    user = get_user_by_email(db, email)
+    user = await get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    if not await verify_password_async(password, user.password_hash):
         return None
     return user
 
-def update_user(db: Session, user_id: int, update_data: dict) -> Optional[User]:
+async def update_user(db: AsyncSession, user_id: int, update_data: dict) -> Optional[User]:
     """Update user information"""
-    user = get_user_by_id(db, user_id)
+    user = await get_user_by_id(db, user_id)
     if not user:
         return None
     
@@ -75,6 +76,9 @@ def update_user(db: Session, user_id: int, update_data: dict) -> Optional[User]:
         if hasattr(user, key) and value is not None:
             setattr(user, key, value)
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    
+    # Cached sessions must not keep serving the old record (e.g. deactivated users)
+    token_user_cache.invalidate_user(user_id)
     return user
\ No newline at end of file
@@ -1,20 +1,97 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import get_settings
+from app.fulltext import init_fulltext
+from app.analytics import init_analytics
+from app.etags import init_table_versions
 
 settings = get_settings()
 
+def get_async_database_url() -> str:
+    """
+    Async driver URL for the configured database:
+    aiosqlite for SQLite, asyncpg for Postgres
+    """
+    if settings.async_database_url:
+        return settings.async_database_url
+    
+    url = settings.database_url
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:") or url.startswith("postgres:"):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+# SQLite PRAGMAs applied to every new connection, per storage profile.
+# 'production' uses WAL so readers never block the writer, NORMAL sync
+# (durable across app crashes, fsync only at checkpoints), a 64 MB page
+# cache and 256 MB of memory-mapped I/O.
+STORAGE_PROFILES = {
+    "baseline": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+def get_storage_pragmas() -> dict:
+    """PRAGMAs for the configured profile, with per-setting overrides"""
+    pragmas = dict(STORAGE_PROFILES[settings.storage_profile])
+    overrides = {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "cache_size": settings.sqlite_cache_size,
+        "mmap_size": settings.sqlite_mmap_size,
+    }
+    pragmas.update({k: v for k, v in overrides.items() if v not in (None, "")})
+    return pragmas
+
+def apply_sqlite_pragmas(sync_engine, pragmas: dict):
+    """Run the PRAGMAs on each connection the engine opens"""
+    if sync_engine.dialect.name != "sqlite" or not pragmas:
+        return
+    
+    @event.listens_for(sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def get_pool_options(url: str) -> dict:
+    """Pool sizing for file-backed and server databases"""
+    if ":memory:" in url:
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_pre_ping": True,
+    }
+
 # Create SQLite engine
 # check_same_thread=False is needed for FastAPI
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False},
+    **get_pool_options(settings.database_url)
 )
+apply_sqlite_pragmas(engine, get_storage_pragmas())
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine - used by request handlers so DB I/O doesn't block the event loop
+async_engine = create_async_engine(get_async_database_url(), **get_pool_options(settings.database_url))
+apply_sqlite_pragmas(async_engine.sync_engine, get_storage_pragmas())
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for models
 Base = declarative_base()
 
@@ -30,10 +107,37 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """
+    Dependency function to get an async database session.
+    Use in FastAPI endpoints like: db: AsyncSession = Depends(get_async_db)
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # Create all tables
 def init_db():
     """
     Initialize database - create all tables
     Call this when app starts
     """
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    
+    # create_all skips tables that already exist, so add any nullable
+    # columns and indexes introduced since those tables were first created
+    existing = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            present = {c["name"] for c in existing.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in present and column.nullable:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+    
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
+    init_fulltext(engine)
+    init_analytics(engine)
+    init_table_versions(engine)
\ No newline at end of file
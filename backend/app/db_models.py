@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -42,6 +42,11 @@ class SearchHistory(Base):
     # Relationships
     user = relationship("User", back_populates="searches")
     bookings = relationship("Booking", back_populates="search")
+    
+    __table_args__ = (
+        # /api/history?status=... newest first
+        Index("ix_search_history_status_created", "search_status", "created_at", "id"),
+    )
 
 class Booking(Base):
     """Bookings table"""
@@ -49,13 +54,14 @@ class Booking(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     booking_id = Column(String(100), unique=True, index=True)
-    search_id = Column(String(100), ForeignKey("search_history.search_id"), nullable=True)
+    search_id = Column(String(100), ForeignKey("search_history.search_id"), nullable=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     
     # Booking details
     flight_id = Column(String(100), nullable=True)
     hotel_id = Column(String(100), nullable=True)
-    booking_type = Column(String(50))  # 'flight_only', 'hotel_only', 'complete_plan', 'autonomous'
+    booking_type = Column(String(50))  # 'flight_only', 'hotel_only', 'complete_plan', 'autonomous', 'group'
+    group_id = Column(String(100), nullable=True, index=True)  # shared by the bookings of one /api/book-group call
     
     # Passenger details
     passenger_first_name = Column(String(100))
@@ -81,6 +87,11 @@ class Booking(Base):
     # Relationships
     user = relationship("User", back_populates="bookings")
     search = relationship("SearchHistory", back_populates="bookings")
+    
+    __table_args__ = (
+        # /api/bookings?status=... newest first
+        Index("ix_bookings_status_created", "status", "created_at", "id"),
+    )
 
 class TravelPlan(Base):
     """Travel plans table - for conversational planning"""
@@ -136,4 +147,84 @@ class Conversation(Base):
     plan_id = Column(String(100), nullable=True)
     
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ItineraryCache(Base):
+    """LLM-generated itineraries - one per (destination, interests, days) profile"""
+    __tablename__ = "itinerary_cache"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(255), unique=True, index=True)
+    
+    destination = Column(String(100))
+    interests = Column(JSON)
+    days = Column(Integer)
+    
+    # Day-wise activities (stored as JSON)
+    itinerary = Column(JSON)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class BookingSaga(Base):
+    """Complete-plan booking saga - one row per attempt, updated at every step"""
+    __tablename__ = "booking_sagas"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    saga_id = Column(String(100), unique=True, index=True)
+    
+    # 'started', 'completed', 'compensating', 'compensated', 'failed'
+    status = Column(String(50), default="started", index=True)
+    
+    # Leg status: 'pending', 'booked', 'failed', 'cancelled'
+    flight_status = Column(String(50), default="pending")
+    hotel_status = Column(String(50), default="pending")
+    
+    # Inputs and supplier responses (stored as JSON)
+    plan_json = Column(JSON)
+    passenger_details = Column(JSON)
+    flight_booking = Column(JSON, nullable=True)
+    hotel_booking = Column(JSON, nullable=True)
+    
+    error = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class RouteDailyStats(Base):
+    """Analytics rollup - one row per (day, route, cabin class), maintained by triggers (see analytics.py)"""
+    __tablename__ = "route_daily_stats"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(String(10), index=True)  # YYYY-MM-DD
+    origin = Column(String(100))
+    destination = Column(String(100))
+    cabin_class = Column(String(50))
+    
+    # Counters
+    searches = Column(Integer, default=0)
+    failed_searches = Column(Integer, default=0)
+    bookings = Column(Integer, default=0)  # confirmed bookings only
+    booking_value = Column(Float, default=0.0)
+    
+    __table_args__ = (
+        UniqueConstraint("day", "origin", "destination", "cabin_class", name="uq_route_daily_stats_key"),
+    )
+
+class ArchivedRecord(Base):
+    """Lookup index for rows moved to the archive files (see retention.py)"""
+    __tablename__ = "archived_records"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    table_name = Column(String(50))
+    record_key = Column(String(100))  # search_id / plan_id / booking_id
+    
+    # Location: <archive_dir>/<table_name>/<partition>.ndjson.gz, gzip member at offset
+    partition = Column(String(7))  # YYYY-MM
+    offset = Column(Integer)
+    length = Column(Integer)
+    
+    archived_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint("table_name", "record_key", name="uq_archived_records_key"),
+    )
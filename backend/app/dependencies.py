@@ -1,17 +1,20 @@
-from fastapi import Depends, HTTPException, status
+import hmac
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.auth import decode_access_token
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.auth import decode_access_token, token_user_cache
+from app.config import get_settings
 from app.crud import get_user_by_email
 from app.db_models import User
 from typing import Optional
 
+settings = get_settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login")
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     Get current authenticated user from JWT token
@@ -22,17 +25,20 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    payload = decode_access_token(token)
-    if payload is None:
-        raise credentials_exception
-    
-    email: str = payload.get("sub")
-    if email is None:
-        raise credentials_exception
-    
-    user = get_user_by_email(db, email=email)
+    user = token_user_cache.get(token)
     if user is None:
-        raise credentials_exception
+        payload = decode_access_token(token)
+        if payload is None:
+            raise credentials_exception
+        
+        email: str = payload.get("sub")
+        if email is None:
+            raise credentials_exception
+        
+        user = await get_user_by_email(db, email=email)
+        if user is None:
+            raise credentials_exception
+        token_user_cache.put(token, payload, user)
     
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
@@ -45,4 +51,14 @@ async def get_current_active_user(
     """Get current active user"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Gate for /api/admin/* routes: the X-Admin-Token header must match
+    admin_api_key. With no key configured the routes are disabled.
+    """
+    if not settings.admin_api_key:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.admin_api_key):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
@@ -0,0 +1,91 @@
+import hashlib
+from typing import Dict, List, Optional
+from fastapi import Request, Response
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+
+settings = get_settings()
+
+# Tables whose reads are served with ETags. Every insert, update or delete
+# bumps the table's counter in table_versions from a trigger, so the
+# version covers all write paths (ORM, write-behind queue, retention) and
+# reading it is a single primary-key lookup - no page or count query.
+VERSIONED_TABLES = ["search_history", "bookings", "travel_plans"]
+
+def _triggers(table: str) -> Dict[str, str]:
+    bump = f"""INSERT INTO table_versions(table_name, version) VALUES ('{table}', 1)
+            ON CONFLICT(table_name) DO UPDATE SET version = version + 1;"""
+    return {
+        f"{table}_version_{suffix}": f"""CREATE TRIGGER IF NOT EXISTS {table}_version_{suffix}
+        AFTER {event} ON {table} BEGIN
+            {bump}
+        END"""
+        for suffix, event in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+    }
+
+TRIGGERS = {name: sql for table in VERSIONED_TABLES for name, sql in _triggers(table).items()}
+
+def init_table_versions(engine: Engine):
+    """Create the version table and its triggers (SQLite only; elsewhere no ETags are sent)"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS table_versions "
+            "(table_name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)"
+        ))
+        for statement in TRIGGERS.values():
+            conn.execute(text(statement))
+
+async def get_versions(db: AsyncSession, tables: List[str]) -> Optional[Dict[str, int]]:
+    if db.bind.dialect.name != "sqlite":
+        return None
+    rows = (await db.execute(
+        text("SELECT table_name, version FROM table_versions WHERE table_name IN :tables")
+        .bindparams(bindparam("tables", expanding=True)),
+        {"tables": tables}
+    )).all()
+    versions = dict(rows)
+    return {table: versions.get(table, 0) for table in tables}
+
+def compute_etag(request: Request, versions: Dict[str, int]) -> str:
+    """
+    Strong ETag over the table versions and the exact resource (path + query),
+    for the identity body; CompressionMiddleware weakens it on encoded bodies
+    """
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    key = f"{request.url.path}?{query}|" + ",".join(f"{t}:{v}" for t, v in sorted(versions.items()))
+    return '"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match uses weak comparison: the strong tag sent with identity
+    bodies and the W/ form CompressionMiddleware sends with encoded ones
+    both match.
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+async def check_not_modified(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    tables: List[str]
+) -> Optional[Response]:
+    """
+    Set ETag and Cache-Control on the route's response; if the client
+    already holds the current representation return the 304 to send instead.
+    """
+    versions = await get_versions(db, tables)
+    headers = {"Cache-Control": settings.http_cache_control}
+    if versions is not None:
+        headers["ETag"] = compute_etag(request, versions)
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
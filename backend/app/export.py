@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator, Optional
+from sqlalchemy import select
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.db_models import Booking, SearchHistory, TravelPlan
+
+settings = get_settings()
+
+EXPORT_TABLES = {
+    "bookings": Booking,
+    "search_history": SearchHistory,
+    "travel_plans": TravelPlan,
+}
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def _csv_value(value):
+    # JSON columns are written as JSON text so the cell round-trips
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+async def stream_export(
+    table: str,
+    fmt: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> AsyncIterator[str]:
+    """
+    Yield every row of a table created in [start_date, end_date] as NDJSON
+    lines or CSV, oldest first. Rows come off a server-side cursor in
+    export_chunk_size batches, so memory stays flat whatever the table size;
+    the single read transaction gives a consistent snapshot of the table.
+    """
+    model = EXPORT_TABLES[table]
+    columns = [column.name for column in model.__table__.columns]
+
+    query = select(model.__table__)
+    if start_date:
+        query = query.where(model.created_at >= datetime.combine(start_date, datetime.min.time()))
+    if end_date:
+        query = query.where(model.created_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+    query = query.order_by(model.created_at, model.id)
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.getvalue()
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=settings.export_chunk_size))
+        async for rows in result.partitions():
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows([_csv_value(row._mapping[c]) for c in columns] for row in rows)
+                yield buffer.getvalue()
+            else:
+                yield "".join(json.dumps(dict(row._mapping), default=str) + "\n" for row in rows)
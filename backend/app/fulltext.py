@@ -0,0 +1,117 @@
+import re
+from typing import Any, Dict, List
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# External-content FTS5 indexes: the text lives only in the base tables and
+# the triggers keep each index in step with every insert, update and delete.
+FTS_TABLES = {
+    "search_history_fts": {
+        "source": "search_history",
+        "columns": ["search_id", "origin", "destination", "cabin_class", "search_status"],
+    },
+    "bookings_fts": {
+        "source": "bookings",
+        "columns": ["booking_id", "confirmation_code", "passenger_first_name", "passenger_last_name", "passenger_email"],
+    },
+}
+
+def _ddl(fts: str, source: str, columns: List[str]) -> List[str]:
+    cols = ", ".join(columns)
+    new_cols = ", ".join(f"new.{c}" for c in columns)
+    old_cols = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{source}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} BEGIN
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {source} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END""",
+    ]
+
+def init_fulltext(engine: Engine):
+    """
+    Create the FTS5 tables and sync triggers (SQLite only).
+    A newly created index is rebuilt from the rows already in its base table.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as conn:
+        for fts, spec in FTS_TABLES.items():
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": fts}
+            ).first()
+            for statement in _ddl(fts, spec["source"], spec["columns"]):
+                conn.execute(text(statement))
+            if not exists:
+                conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+def to_match_query(q: str) -> str:
+    """
+    Turn free text into a safe FTS5 query: every word must match as a prefix.
+    'priya@exa' -> '"priya"* "exa"*'
+    """
+    tokens = re.findall(r"\w+", q, flags=re.UNICODE)
+    return " ".join(f'"{token}"*' for token in tokens)
+
+async def search_bookings(db: AsyncSession, q: str, limit: int) -> List[Dict[str, Any]]:
+    """Best-ranked bookings for a passenger name, email, booking id or confirmation code"""
+    rows = (await db.execute(text("""
+        SELECT b.booking_id, b.confirmation_code, b.passenger_first_name, b.passenger_last_name,
+               b.passenger_email, b.booking_type, b.status, b.total_amount, b.created_at,
+               bm25(bookings_fts) AS rank
+        FROM bookings_fts
+        JOIN bookings b ON b.id = bookings_fts.rowid
+        WHERE bookings_fts MATCH :q
+        ORDER BY rank
+        LIMIT :limit
+    """), {"q": to_match_query(q), "limit": limit})).mappings().all()
+
+    return [
+        {
+            "booking_id": r["booking_id"],
+            "confirmation_code": r["confirmation_code"],
+            "passenger_name": f"{r['passenger_first_name']} {r['passenger_last_name']}",
+            "passenger_email": r["passenger_email"],
+            "booking_type": r["booking_type"],
+            "status": r["status"],
+            "total_amount": r["total_amount"],
+            "created_at": str(r["created_at"]),
+            "rank": r["rank"],
+        }
+        for r in rows
+    ]
+
+async def search_history(db: AsyncSession, q: str, limit: int) -> List[Dict[str, Any]]:
+    """Best-ranked searches for a city, cabin class, status or search id"""
+    rows = (await db.execute(text("""
+        SELECT s.search_id, s.origin, s.destination, s.departure_date, s.cabin_class,
+               s.search_status, s.created_at, bm25(search_history_fts) AS rank
+        FROM search_history_fts
+        JOIN search_history s ON s.id = search_history_fts.rowid
+        WHERE search_history_fts MATCH :q
+        ORDER BY rank
+        LIMIT :limit
+    """), {"q": to_match_query(q), "limit": limit})).mappings().all()
+
+    return [
+        {
+            "search_id": r["search_id"],
+            "origin": r["origin"],
+            "destination": r["destination"],
+            "departure_date": r["departure_date"],
+            "cabin_class": r["cabin_class"],
+            "search_status": r["search_status"],
+            "created_at": str(r["created_at"]),
+            "rank": r["rank"],
+        }
+        for r in rows
+    ]
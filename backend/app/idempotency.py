@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from fastapi import HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+
+settings = get_settings()
+
+# Set for the duration of an idempotent handler; idempotent_commit() flips
+# it just before committing so an interruption can tell whether anything
+# may have been saved
+_commit_started: ContextVar[Optional[Dict[str, bool]]] = ContextVar("idempotency_commit_started", default=None)
+
+async def idempotent_commit(db: AsyncSession):
+    """Commit from inside an idempotent handler, recording that the commit began"""
+    state = _commit_started.get()
+    if state is not None:
+        state["started"] = True
+    await db.commit()
+
+class IdempotencyStore:
+    """
+    In-process store of completed responses keyed by Idempotency-Key.
+    Completed responses are replayed until their TTL expires; a retry that
+    arrives while the original is still running waits for its result.
+    Failed requests are not stored, so they can be retried.
+
+    A request interrupted (cancelled) before its handler began committing
+    saved nothing, so its key is released. One interrupted after that
+    point may already have saved its booking: the key is then held as
+    unresolved and retries get 409 until the TTL expires rather than
+    booking a second time.
+
+    Each worker process has its own store, so a retry is only deduplicated
+    when it reaches the worker that handled the original. Run a single
+    worker, or route by Idempotency-Key at the load balancer, when
+    duplicates across workers matter.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._completed: OrderedDict[str, Tuple[float, str, Any]] = OrderedDict()
+        self._in_flight: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self._unresolved: OrderedDict[str, Tuple[float, str]] = OrderedDict()
+
+    @staticmethod
+    def fingerprint(payload: Any) -> str:
+        """Stable hash of a request body"""
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        for entries in (self._completed, self._unresolved):
+            while entries:
+                stored_at = next(iter(entries.values()))[0]
+                if now - stored_at < self.ttl_seconds and len(entries) <= self.max_entries:
+                    break
+                entries.popitem(last=False)
+
+    def _check_fingerprint(self, stored: str, fingerprint: str):
+        if stored != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used with a different request body"
+            )
+
+    @staticmethod
+    def _unresolved_error() -> HTTPException:
+        return HTTPException(
+            status_code=409,
+            detail="The original request with this Idempotency-Key was interrupted while saving and may "
+                   "have completed; check your bookings before retrying with a new key"
+        )
+
+    async def run(self, key: str, fingerprint: str, handler: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Return (result, replayed). Runs handler at most once per key.
+        """
+        self._purge_expired()
+
+        if key in self._completed:
+            _, stored_fingerprint, result = self._completed[key]
+            self._check_fingerprint(stored_fingerprint, fingerprint)
+            return result, True
+
+        if key in self._unresolved:
+            self._check_fingerprint(self._unresolved[key][1], fingerprint)
+            raise self._unresolved_error()
+
+        if key in self._in_flight:
+            stored_fingerprint, future = self._in_flight[key]
+            self._check_fingerprint(stored_fingerprint, fingerprint)
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = (fingerprint, future)
+        commit_state = {"started": False}
+        token = _commit_started.set(commit_state)
+        try:
+            result = await handler()
+        except asyncio.CancelledError:
+            # The original request went away (e.g. client disconnect) part-way
+            # through. Before its commit nothing was saved and the key can be
+            # retried; after it the booking may exist, so the key is held
+            if commit_state["started"]:
+                self._unresolved[key] = (time.monotonic(), fingerprint)
+                future.set_exception(self._unresolved_error())
+            else:
+                future.set_exception(HTTPException(
+                    status_code=409,
+                    detail="The original request with this Idempotency-Key was interrupted; retry"
+                ))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when no retry is waiting on it
+            future.exception()
+            raise
+        finally:
+            _commit_started.reset(token)
+            del self._in_flight[key]
+
+        self._completed[key] = (time.monotonic(), fingerprint, result)
+        future.set_result(result)
+        return result, False
+
+idempotency_store = IdempotencyStore(settings.idempotency_ttl_seconds, settings.idempotency_max_entries)
+
+async def run_idempotent(
+    scope: str,
+    idempotency_key: Optional[str],
+    payload: Any,
+    response: Response,
+    handler: Callable[[], Awaitable[Any]]
+) -> Any:
+    """
+    Run a route handler under an optional Idempotency-Key.
+    Replayed responses carry an Idempotent-Replayed header.
+    """
+    if not idempotency_key:
+        return await handler()
+
+    result, replayed = await idempotency_store.run(
+        f"{scope}:{idempotency_key}",
+        IdempotencyStore.fingerprint(payload),
+        handler
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
@@ -1,17 +1,60 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import router
+from app.routes import router, get_travel_planner
 from app.config import get_settings
 from app.database import init_db
+from app.write_behind import write_behind
+from app.retention import retention_job
+from app.rate_limit import RateLimitMiddleware
+from app.warmup import warmup
+from app.responses import FastJSONResponse
+from app.compression import CompressionMiddleware
 
 settings = get_settings()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup: create tables, start saga recovery and the background writers,
+    and kick off warmup (readiness waits for it).
+    Shutdown: stop background jobs and flush queued history rows.
+    """
+    init_db()
+    print("✅ Database initialized successfully!")
+    travel_planner = get_travel_planner()
+    travel_planner.saga.start()
+    write_behind.start()
+    retention_job.start()
+    
+    warmup_task = None
+    if settings.warmup_enabled:
+        warmup_task = asyncio.create_task(warmup.run(travel_planner))
+    else:
+        warmup.status = "ready"
+    
+    yield
+    
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    await travel_planner.llm.breaker.stop()
+    await travel_planner.saga.stop()
+    await retention_job.stop()
+    await write_behind.stop()
+
 app = FastAPI(
     title="Travel Booking Agent API",
     description="AI-powered autonomous travel booking agent",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # Every route, response_model ones included, renders through orjson
+    default_response_class=FastJSONResponse
 )
 
+# Rate limiting - added before CORS so 429s still carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -21,12 +64,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize database on startup
-@app.on_event("startup")
-def startup_event():
-    """Create database tables on startup"""
-    init_db()
-    print("✅ Database initialized successfully!")
+# Compression of large responses - outermost, so it sees final bodies
+app.add_middleware(CompressionMiddleware)
 
 # Include routes
 app.include_router(router)
@@ -63,7 +63,9 @@ class AutonomousBookingResponse(BaseModel):
     status: str
     thoughts: List[AgentThought]
     all_flights: List[Dict[str, Any]]
-    selected_flight: Dict[str, Any]
+    # The booked flight is all_flights[selected_flight_index] - not repeated in full
+    selected_flight_index: int
+    selected_flight_id: str
     selection_reason: str
     booking_result: Dict[str, Any]
     message: str
@@ -83,14 +85,17 @@ class ChatMessage(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str = Field(..., description="User message")
+    conversation_id: Optional[str] = Field(None, description="Session from a previous turn; omit to start one")
+    # Legacy client-held state - only used to seed a new conversation
     conversation_history: List[ChatMessage] = Field(default=[], description="Previous conversation")
     extracted_info: Optional[Dict[str, Any]] = Field(default={}, description="Previously extracted travel info")
 
 class ChatResponse(BaseModel):
+    conversation_id: str = Field(..., description="Send back with the next message")
     message: str = Field(..., description="AI response")
-    extracted_info: Dict[str, Any] = Field(..., description="Extracted travel information")
+    extracted_info_delta: Dict[str, Any] = Field(..., description="Travel info fields added or changed this turn")
     is_ready_to_plan: bool = Field(..., description="Whether we have enough info to generate plan")
-    conversation_history: List[ChatMessage] = Field(..., description="Updated conversation history")
+    message_count: int = Field(..., description="Messages stored in the conversation")
 
 class TravelPlanRequest(BaseModel):
     destination: str
@@ -101,6 +106,19 @@ class TravelPlanRequest(BaseModel):
     departure_date: Optional[str] = None
     passengers: int = Field(default=1)
 
+class BatchTravelPlanRequest(BaseModel):
+    requests: List[TravelPlanRequest] = Field(..., min_length=1, description="One plan request per traveler")
+    max_concurrency: Optional[int] = Field(None, ge=1, le=16, description="Plans built in parallel (defaults to server setting)")
+
+class CompareDestinationsRequest(BaseModel):
+    destinations: List[str] = Field(..., min_length=2, max_length=5, description="Candidate destinations")
+    origin: Optional[str] = Field(default="Delhi")
+    budget: float
+    days: int
+    interests: List[str] = Field(default=[])
+    departure_date: Optional[str] = None
+    passengers: int = Field(default=1)
+
 class Hotel(BaseModel):
     hotel_id: str
     name: str
@@ -133,14 +151,70 @@ class TravelPlan(BaseModel):
     itinerary: List[DayItinerary]
     summary: str
     interests: List[str]
+    alternatives: List[Dict[str, Any]] = Field(default=[])
 
 class CompletePlanBookingRequest(BaseModel):
     plan: TravelPlan
     passenger_details: Dict[str, Any]
 
 class CompletePlanBookingResponse(BaseModel):
+    saga_id: Optional[str] = None
     status: str
     flight_booking: Dict[str, Any]
     hotel_booking: Dict[str, Any]
     total_cost: float
-    message: str
\ No newline at end of file
+    message: str
+
+class DestinationCandidate(BaseModel):
+    rank: int
+    destination: str
+    score: float
+    cost_score: float
+    interest_fit: float
+    plan_id: str
+    plan: TravelPlan
+
+class DestinationFailure(BaseModel):
+    destination: str
+    error: str
+
+class CompareDestinationsResponse(BaseModel):
+    candidates: List[DestinationCandidate]
+    recommended: str
+    failed: List[DestinationFailure] = []
+
+class ReplanRequest(BaseModel):
+    budget: Optional[float] = None
+    days: Optional[int] = Field(None, ge=1)
+    interests: Optional[List[str]] = None
+    departure_date: Optional[str] = None
+    passengers: Optional[int] = Field(None, ge=1)
+
+class ReplanResponse(BaseModel):
+    plan_id: str
+    previous_plan_id: str
+    recomputed: List[str] = Field(..., description="Parts of the plan rebuilt for this change")
+    plan: TravelPlan
+
+class GroupBookingRequest(BaseModel):
+    flight_id: str
+    flight_details: Optional[Dict[str, Any]] = Field(None, description="Selected flight, stored with each booking")
+    hotel_id: Optional[str] = None
+    hotel_details: Optional[Dict[str, Any]] = Field(None, description="Selected hotel plus check_in / check_out")
+    passengers: List[Dict[str, Any]] = Field(..., min_length=1, max_length=100, description="One entry per passenger")
+
+class PassengerBookingResult(BaseModel):
+    index: int
+    status: str
+    booking_id: Optional[str] = None
+    confirmation_code: Optional[str] = None
+    hotel_booking_id: Optional[str] = None
+    message: Optional[str] = None
+
+class GroupBookingResponse(BaseModel):
+    group_id: str
+    status: str = Field(..., description="'confirmed', 'partial' or 'failed'")
+    booked: int
+    failed: int
+    total_amount: float
+    results: List[PassengerBookingResult]
\ No newline at end of file
@@ -0,0 +1,75 @@
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+
+settings = get_settings()
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque cursor pointing just past a (created_at, id) row"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises 400 for a malformed cursor"""
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def count_rows(db: AsyncSession, query, mode: str) -> Dict[str, Any]:
+    """
+    Total for a filtered query.
+    'exact' counts every row, 'approximate' stops counting at
+    approximate_count_cap, 'none' skips the count entirely.
+    """
+    if mode == "none":
+        return {"total": None, "total_capped": False}
+
+    if mode == "approximate":
+        cap = settings.approximate_count_cap
+        capped = query.with_only_columns(query.selected_columns[0]).limit(cap + 1).subquery()
+        total = await db.scalar(select(func.count()).select_from(capped))
+        return {"total": min(total, cap), "total_capped": total > cap}
+
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    return {"total": total, "total_capped": False}
+
+async def fetch_page(
+    db: AsyncSession,
+    query,
+    model,
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[str] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Newest-first page of a query ordered by (created_at, id).
+    With a cursor the page is found by keyset seek, which stays flat however
+    deep the page is; without one the legacy offset is applied.
+    Returns the rows and the cursor for the next page (None on the last page).
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # Written as a bounded range so the created_at index is searched, not scanned
+        query = query.where(and_(
+            model.created_at <= created_at,
+            or_(model.created_at < created_at, model.id < row_id)
+        ))
+    elif offset:
+        query = query.offset(offset)
+
+    rows = (await db.execute(
+        query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    )).scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return rows, next_cursor
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import math
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, Request
+from app.auth import decode_access_token
+from app.config import get_settings
+
+settings = get_settings()
+
+# (method, path pattern, cost) - cost is roughly the number of LLM
+# completions the route triggers, so one bucket covers every route fairly
+ROUTE_COSTS: List[Tuple[str, re.Pattern, int]] = [
+    ("POST", re.compile(r"^/api/chat$"), 2),                  # extract info + next question
+    ("POST", re.compile(r"^/api/search$"), 2),                # intent + summary
+    ("POST", re.compile(r"^/api/search-and-book$"), 2),       # intent + flight choice
+    ("POST", re.compile(r"^/api/plan-travel$"), 2),           # itinerary + summary
+    ("POST", re.compile(r"^/api/plan-travel/compare$"), 4),   # itineraries + one batched summary
+    ("POST", re.compile(r"^/api/plans/[^/]+/replan$"), 2),
+]
+
+# /api/plan-travel/batch is charged inside the route once the body is
+# parsed, per distinct plan requested (identical requests share one plan),
+# since one call can build up to batch_plan_max_requests plans
+BATCH_PLAN_COST_PER_REQUEST = 2
+
+def route_cost(method: str, path: str) -> int:
+    for route_method, pattern, cost in ROUTE_COSTS:
+        if method == route_method and pattern.match(path):
+            return cost
+    return 0
+
+def _refill(tokens: float, updated: float, now: float, capacity: float, rate: float) -> float:
+    return min(capacity, tokens + (now - updated) * rate)
+
+class MemoryBucketStore:
+    """Token buckets in this process; idle buckets are evicted oldest first"""
+
+    def __init__(self, max_buckets: int):
+        self.max_buckets = max_buckets
+        self._buckets: OrderedDict[str, Tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, cost: float, capacity: float, rate: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = _refill(tokens, updated, now, capacity, rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    async def refund(self, key: str, cost: float, capacity: float):
+        if key in self._buckets:
+            tokens, updated = self._buckets[key]
+            self._buckets[key] = (min(capacity, tokens + cost), updated)
+
+class SQLiteBucketStore:
+    """
+    Token buckets in a small SQLite file so every worker process shares them.
+    Each take is one IMMEDIATE transaction, which serializes concurrent workers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def _take(self, key: str, cost: float, capacity: float, rate: float) -> Tuple[bool, float]:
+        # Wall clock, since monotonic clocks differ between processes
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)).fetchone()
+            tokens = _refill(*row, now, capacity, rate) if row else capacity
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            conn.execute(
+                "INSERT INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (key, tokens, now)
+            )
+            conn.execute("COMMIT")
+            return allowed, tokens
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    async def take(self, key: str, cost: float, capacity: float, rate: float) -> Tuple[bool, float]:
+        return await asyncio.to_thread(self._take, key, cost, capacity, rate)
+
+    def _refund(self, key: str, cost: float, capacity: float):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE rate_limit_buckets SET tokens = MIN(?, tokens + ?) WHERE key = ?",
+                (capacity, cost, key)
+            )
+        finally:
+            conn.close()
+
+    async def refund(self, key: str, cost: float, capacity: float):
+        await asyncio.to_thread(self._refund, key, cost, capacity)
+
+def create_bucket_store():
+    if settings.rate_limit_store == "sqlite":
+        return SQLiteBucketStore(settings.rate_limit_sqlite_path)
+    return MemoryBucketStore(settings.rate_limit_max_buckets)
+
+class RateLimiter:
+    """
+    Charges requests against token buckets: always one per client IP and,
+    for a bearer token whose signature verifies, one per user as well, so
+    minting tokens cannot lift the IP limit. A request passes only when
+    every bucket has the tokens. Shared by RateLimitMiddleware (fixed route
+    costs) and routes whose cost depends on the request body (charge()).
+    """
+
+    def __init__(self, store=None):
+        self._store = store
+
+    @property
+    def store(self):
+        # Created on first use so importing the app doesn't open the SQLite store
+        if self._store is None:
+            self._store = create_bucket_store()
+        return self._store
+
+    def identities(self, scope) -> List[Tuple[str, float, float]]:
+        """(bucket key, capacity, refill per second) for every bucket the request is charged to"""
+        headers = dict(scope.get("headers") or [])
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+        if settings.rate_limit_trust_forwarded_for and b"x-forwarded-for" in headers:
+            client_ip = headers[b"x-forwarded-for"].decode().split(",")[0].strip()
+        buckets = [(f"ip:{client_ip}", settings.rate_limit_ip_capacity, settings.rate_limit_ip_refill_per_second)]
+
+        authorization = headers.get(b"authorization", b"").decode()
+        if authorization.lower().startswith("bearer "):
+            # decode_access_token verifies the signature; None for a forged or expired token
+            payload = decode_access_token(authorization[7:])
+            if payload and payload.get("sub"):
+                buckets.append((f"user:{payload['sub']}", settings.rate_limit_user_capacity, settings.rate_limit_user_refill_per_second))
+        return buckets
+
+    async def take(self, scope, cost: float) -> Tuple[bool, float, int]:
+        """
+        Returns (allowed, tokens left in the emptiest bucket, retry-after seconds).
+        The cost is capped at each bucket's capacity, so a large request drains
+        a full bucket rather than being refused forever. When a later bucket
+        refuses, the tokens already taken from earlier ones are given back.
+        """
+        taken = []
+        remaining = math.inf
+        for key, capacity, rate in self.identities(scope):
+            bucket_cost = min(cost, capacity)
+            allowed, tokens = await self.store.take(key, bucket_cost, capacity, rate)
+            if not allowed:
+                for taken_key, taken_cost, taken_capacity in taken:
+                    await self.store.refund(taken_key, taken_cost, taken_capacity)
+                return False, tokens, max(1, math.ceil((bucket_cost - tokens) / rate))
+            taken.append((key, bucket_cost, capacity))
+            remaining = min(remaining, tokens)
+        return True, remaining, 0
+
+    async def charge(self, request: Request, cost: float):
+        """Charge a request whose cost is only known from its body; raises 429 when throttled"""
+        if not settings.rate_limit_enabled or cost <= 0:
+            return
+        allowed, _, retry_after = await self.take(request.scope, cost)
+        if not allowed:
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded, retry later",
+                headers={"Retry-After": str(retry_after), "X-RateLimit-Remaining": "0"}
+            )
+
+rate_limiter = RateLimiter()
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware charging each LLM-heavy request against the client's
+    token buckets (see RateLimiter). Throttled requests get 429 with
+    Retry-After; allowed ones carry X-RateLimit-Remaining.
+    """
+
+    def __init__(self, app, limiter: RateLimiter = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.rate_limit_enabled:
+            return await self.app(scope, receive, send)
+
+        cost = route_cost(scope["method"], scope["path"])
+        if not cost:
+            return await self.app(scope, receive, send)
+
+        allowed, tokens, retry_after = await self.limiter.take(scope, cost)
+
+        if not allowed:
+            body = json.dumps({"detail": "Rate limit exceeded, retry later"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(retry_after).encode()),
+                    (b"x-ratelimit-remaining", b"0"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_remaining(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-ratelimit-remaining", str(math.floor(tokens)).encode())
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_remaining)
@@ -0,0 +1,14 @@
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson - several times faster than json.dumps
+    and it encodes datetimes natively. The app's default response class:
+    plain dicts and the JSON-mode output of response_model validation are
+    both rendered here.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
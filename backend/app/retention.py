@@ -0,0 +1,197 @@
+import asyncio
+import gzip
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.database import SessionLocal, engine
+from app.db_models import ArchivedRecord, Booking, SearchHistory, TravelPlan
+
+settings = get_settings()
+
+# Archivable tables: the key rows are looked up by once archived, the setting
+# holding their retention age and any extra condition a row must meet
+RETENTION_TABLES = {
+    "search_history": {
+        "model": SearchHistory,
+        "key": "search_id",
+        "days": "retention_search_history_days",
+        # A search stays while any live booking references it; archiving it
+        # would leave bookings.search_id dangling (and fail on FK-enforcing
+        # databases) and move the booking's rollup key in analytics
+        "where": lambda model: ~exists().where(Booking.search_id == model.search_id),
+    },
+    "travel_plans": {
+        "model": TravelPlan,
+        "key": "plan_id",
+        "days": "retention_travel_plans_days",
+        "where": lambda model: model.is_booked == 0,
+    },
+    "bookings": {
+        "model": Booking,
+        "key": "booking_id",
+        "days": "retention_bookings_days",
+    },
+}
+
+class RetentionJob:
+    """
+    Moves rows past their retention age out of the live tables into
+    <archive_dir>/<table>/<YYYY-MM>.ndjson.gz. Each batch is appended as its
+    own gzip member and archived_records stores the member's offset, so a
+    single record is found by id without decompressing the whole month.
+    """
+
+    def __init__(self, archive_dir: str, batch_size: int, interval_hours: float):
+        self.archive_dir = archive_dir
+        self.batch_size = batch_size
+        self.interval_hours = interval_hours
+        self._task: asyncio.Task = None
+        self._lock = threading.Lock()
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    def start(self):
+        """Run the job every interval_hours in the background (call from app startup)"""
+        if self._task is None and self.interval_hours > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_hours * 3600)
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                print(f"Retention run failed: {e}")
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Archive every table past its retention age, then compact the database file"""
+        now = now or datetime.utcnow()
+        with self._lock:
+            tables = {}
+            for table, spec in RETENTION_TABLES.items():
+                days = getattr(settings, spec["days"])
+                if days > 0:
+                    tables[table] = self._archive_table(table, spec, now - timedelta(days=days))
+
+            report = {
+                "started_at": now.isoformat(),
+                "tables": tables,
+                "vacuumed": self._compact() if any(t["archived"] for t in tables.values()) else False,
+            }
+            self.last_report = report
+            return report
+
+    def _archive_table(self, table: str, spec: Dict[str, Any], cutoff: datetime) -> Dict[str, Any]:
+        model = spec["model"]
+        archived, partitions, last_id = 0, set(), 0
+
+        while True:
+            query = select(model.__table__).where(model.created_at < cutoff, model.id > last_id)
+            if "where" in spec:
+                query = query.where(spec["where"](model))
+            with SessionLocal() as db:
+                rows = db.execute(query.order_by(model.id).limit(self.batch_size)).mappings().all()
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+
+            by_month: Dict[str, List[Dict[str, Any]]] = {}
+            for row in rows:
+                by_month.setdefault(row["created_at"].strftime("%Y-%m"), []).append(dict(row))
+
+            # Files are written and fsynced before the rows are deleted; a crash
+            # in between leaves an unreferenced member and the rows still live
+            index_rows = []
+            for month, month_rows in by_month.items():
+                offset, length = self._append_member(table, month, month_rows)
+                index_rows.extend(
+                    {
+                        "table_name": table,
+                        "record_key": row[spec["key"]],
+                        "partition": month,
+                        "offset": offset,
+                        "length": length,
+                    }
+                    for row in month_rows
+                )
+                partitions.add(month)
+
+            with SessionLocal() as db:
+                db.execute(insert(ArchivedRecord), index_rows)
+                db.execute(delete(model).where(model.id.in_([row["id"] for row in rows])))
+                db.commit()
+            archived += len(rows)
+
+        if archived:
+            print(f"Archived {archived} {table} row(s) older than {cutoff.date()}")
+        return {"archived": archived, "cutoff": cutoff.isoformat(), "partitions": sorted(partitions)}
+
+    def _partition_path(self, table: str, partition: str) -> str:
+        return os.path.join(self.archive_dir, table, f"{partition}.ndjson.gz")
+
+    def _append_member(self, table: str, partition: str, rows: List[Dict[str, Any]]):
+        """Append rows as one gzip member; returns its (offset, length)"""
+        path = self._partition_path(table, partition)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = "".join(json.dumps(row, default=str) + "\n" for row in rows)
+        member = gzip.compress(payload.encode())
+
+        with open(path, "ab") as f:
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+            f.write(member)
+            f.flush()
+            os.fsync(f.fileno())
+        return offset, len(member)
+
+    def _compact(self) -> bool:
+        """VACUUM once enough of the SQLite file is free pages"""
+        if engine.dialect.name != "sqlite":
+            return False
+
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            free = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+            total = conn.exec_driver_sql("PRAGMA page_count").scalar()
+            if not total or free / total < settings.retention_vacuum_free_ratio:
+                return False
+            conn.exec_driver_sql("VACUUM")
+        return True
+
+    def _read_member(self, table: str, entry: Dict[str, Any], key: str) -> Optional[Dict[str, Any]]:
+        with open(self._partition_path(table, entry["partition"]), "rb") as f:
+            f.seek(entry["offset"])
+            member = f.read(entry["length"])
+        for line in gzip.decompress(member).splitlines():
+            record = json.loads(line)
+            if record.get(RETENTION_TABLES[table]["key"]) == key:
+                return record
+        return None
+
+    async def lookup(self, db: AsyncSession, table: str, key: str) -> Optional[Dict[str, Any]]:
+        """Fetch one archived row by its key, or None if it was never archived"""
+        entry = (await db.execute(
+            select(ArchivedRecord.partition, ArchivedRecord.offset, ArchivedRecord.length)
+            .where(ArchivedRecord.table_name == table, ArchivedRecord.record_key == key)
+        )).mappings().first()
+        if entry is None:
+            return None
+        return await asyncio.to_thread(self._read_member, table, dict(entry), key)
+
+retention_job = RetentionJob(
+    settings.archive_dir,
+    settings.retention_batch_size,
+    settings.retention_interval_hours
+)
@@ -1,40 +1,113 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, Header, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import (
     SearchRequest, SearchResponse, BookingRequest, 
     BookingResponse, HistoryItem, AutonomousBookingRequest,
     AutonomousBookingResponse, ChatRequest, ChatResponse,
     TravelPlanRequest, TravelPlan, CompletePlanBookingRequest,
-    CompletePlanBookingResponse, ChatMessage
+    CompletePlanBookingResponse, BatchTravelPlanRequest,
+    CompareDestinationsRequest, CompareDestinationsResponse, DestinationCandidate,
+    DestinationFailure,
+    ReplanRequest, ReplanResponse, GroupBookingRequest, GroupBookingResponse,
+    PassengerBookingResult
 )
 from app.db_models import SearchHistory, Booking, TravelPlan as DBTravelPlan
-from app.database import get_db
-from app.services.agent import TravelAgent
-from app.services.llm_client import LLMClient
-from app.services.travel_planner import TravelPlanner
+from app.database import get_async_db, AsyncSessionLocal
+from app.config import get_settings
+from app.idempotency import idempotent_commit, run_idempotent
+from app.write_behind import write_behind
+from app.conversations import conversation_store, info_delta
+from app.retention import RETENTION_TABLES, retention_job
+from app.export import EXPORT_TABLES, MEDIA_TYPES, stream_export
+from app.warmup import warmup
+from app.pagination import count_rows, fetch_page
+from app.etags import check_not_modified
+from app.dependencies import require_admin
+from app.rate_limit import BATCH_PLAN_COST_PER_REQUEST, rate_limiter
+from app import analytics, fulltext
+from app.fulltext import to_match_query
+from functools import lru_cache
 from typing import List, Optional
 import asyncio
-from datetime import datetime
+from datetime import date, datetime
+import json
+import time
 import uuid
 
+settings = get_settings()
 router = APIRouter()
-agent = TravelAgent()
-llm_client = LLMClient()
-travel_planner = TravelPlanner()
+
+# Services are built on first use rather than at import, so a worker boots
+# without constructing (or importing) the whole agent stack
+
+@lru_cache()
+def get_agent():
+    from app.services.agent import TravelAgent
+    return TravelAgent()
+
+@lru_cache()
+def get_llm_client():
+    from app.services.llm_client import LLMClient
+    return LLMClient()
+
+@lru_cache()
+def get_travel_planner():
+    from app.services.travel_planner import TravelPlanner
+    return TravelPlanner()
 
 @router.post("/api/search", response_model=SearchResponse)
-async def search_flights(request: SearchRequest, db: Session = Depends(get_db)):
+async def search_flights(request: SearchRequest):
     """
     Search for flights based on user criteria
     """
     try:
         search_params = request.dict()
-        response = await agent.process_search(search_params)
+        response = await get_agent().process_search(search_params)
         
-        # Save to database
+        # Queue for the batched history writer
         if response.status == "success":
+            await write_behind.enqueue(SearchHistory, {
+                "search_id": response.search_id,
+                "origin": search_params.get('origin'),
+                "destination": search_params.get('destination'),
+                "departure_date": search_params.get('departure_date'),
+                "return_date": search_params.get('return_date'),
+                "passengers": search_params.get('passengers', 1),
+                "trip_type": search_params.get('trip_type', 'one_way'),
+                "cabin_class": search_params.get('cabin_class', 'economy'),
+                "result_count": len(response.flights),
+                "search_status": 'success'
+            })
+        
+        return response
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/api/search-and-book", response_model=AutonomousBookingResponse)
+async def search_and_book_autonomous(
+    request: AutonomousBookingRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    Autonomous booking: Search for flights and automatically book the best option
+    """
+    async def process():
+        try:
+            search_params = request.search_params.dict()
+            passenger_details = request.passenger_details
+
+            result = await get_agent().process_search_and_book(search_params, passenger_details)
+
+            if result['status'] == 'error':
+                raise HTTPException(status_code=400, detail=result['message'])
+
+            # Save search to database
             db_search = SearchHistory(
-                search_id=response.search_id,
+                search_id=result['search_id'],
                 origin=search_params.get('origin'),
                 destination=search_params.get('destination'),
                 departure_date=search_params.get('departure_date'),
@@ -42,122 +115,191 @@ async def search_flights(request: SearchRequest, db: Session = Depends(get_db)):
                 passengers=search_params.get('passengers', 1),
                 trip_type=search_params.get('trip_type', 'one_way'),
                 cabin_class=search_params.get('cabin_class', 'economy'),
-                result_count=len(response.flights),
+                result_count=len(result['all_flights']),
                 search_status='success'
             )
             db.add(db_search)
-            db.commit()
-            db.refresh(db_search)
-        
-        return response
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/api/search-and-book", response_model=AutonomousBookingResponse)
-async def search_and_book_autonomous(request: AutonomousBookingRequest, db: Session = Depends(get_db)):
-    """
-    Autonomous booking: Search for flights and automatically book the best option
-    """
-    try:
-        search_params = request.search_params.dict()
-        passenger_details = request.passenger_details
-        
-        result = await agent.process_search_and_book(search_params, passenger_details)
-        
-        if result['status'] == 'error':
-            raise HTTPException(status_code=400, detail=result['message'])
-        
-        # Save search to database
-        db_search = SearchHistory(
-            search_id=result['search_id'],
-            origin=search_params.get('origin'),
-            destination=search_params.get('destination'),
-            departure_date=search_params.get('departure_date'),
-            return_date=search_params.get('return_date'),
-            passengers=search_params.get('passengers', 1),
-            trip_type=search_params.get('trip_type', 'one_way'),
-            cabin_class=search_params.get('cabin_class', 'economy'),
-            result_count=len(result['all_flights']),
-            search_status='success'
-        )
-        db.add(db_search)
-        db.commit()
-        
-        # Save booking to database
-        db_booking = Booking(
-            booking_id=result['booking_result']['booking_id'],
-            search_id=result['search_id'],
-            flight_id=result['selected_flight']['flight_id'],
-            booking_type='autonomous',
-            passenger_first_name=passenger_details.get('firstName'),
-            passenger_last_name=passenger_details.get('lastName'),
-            passenger_email=passenger_details.get('email'),
-            passenger_phone=passenger_details.get('phone'),
-            flight_details=result['selected_flight'],
-            total_amount=result['selected_flight']['price'],
-            currency=result['selected_flight']['currency'],
-            status='confirmed',
-            confirmation_code=result['booking_result'].get('confirmation_code')
-        )
-        db.add(db_booking)
-        db.commit()
-        
-        return AutonomousBookingResponse(
-            search_id=result['search_id'],
-            status=result['status'],
-            thoughts=result['thoughts'],
-            all_flights=result['all_flights'],
-            selected_flight=result['selected_flight'],
-            selection_reason=result['selection_reason'],
-            booking_result=result['booking_result'],
-            message=result['message']
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+            # Save booking to database in the same transaction - it references the search
+            db_booking = Booking(
+                booking_id=result['booking_result']['booking_id'],
+                search_id=result['search_id'],
+                flight_id=result['selected_flight']['flight_id'],
+                booking_type='autonomous',
+                passenger_first_name=passenger_details.get('firstName'),
+                passenger_last_name=passenger_details.get('lastName'),
+                passenger_email=passenger_details.get('email'),
+                passenger_phone=passenger_details.get('phone'),
+                flight_details=result['selected_flight'],
+                total_amount=result['selected_flight']['price'],
+                currency=result['selected_flight']['currency'],
+                status='confirmed',
+                confirmation_code=result['booking_result'].get('confirmation_code')
+            )
+            db.add(db_booking)
+            await idempotent_commit(db)
+
+            return AutonomousBookingResponse(
+                search_id=result['search_id'],
+                status=result['status'],
+                thoughts=result['thoughts'],
+                all_flights=result['all_flights'],
+                selected_flight_index=next(
+                    i for i, f in enumerate(result['all_flights'])
+                    if f['flight_id'] == result['selected_flight']['flight_id']
+                ),
+                selected_flight_id=result['selected_flight']['flight_id'],
+                selection_reason=result['selection_reason'],
+                booking_result=result['booking_result'],
+                message=result['message']
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await run_idempotent("search-and-book", idempotency_key, request.dict(), response, process)
 
 @router.post("/api/book", response_model=BookingResponse)
-async def book_flight(request: BookingRequest, db: Session = Depends(get_db)):
+async def book_flight(
+    request: BookingRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
     """
     Book a selected flight
     """
-    try:
-        result = await agent.make_booking(
-            request.flight_id,
-            request.passenger_details
-        )
-        
-        # Save booking to database
-        db_booking = Booking(
-            booking_id=result['booking_id'],
-            flight_id=request.flight_id,
-            booking_type='flight_only',
-            passenger_first_name=request.passenger_details.get('firstName'),
-            passenger_last_name=request.passenger_details.get('lastName'),
-            passenger_email=request.passenger_details.get('email'),
-            passenger_phone=request.passenger_details.get('phone'),
-            total_amount=0,  # Would come from flight details
-            status='confirmed',
-            confirmation_code=result.get('confirmation_code')
-        )
-        db.add(db_booking)
-        db.commit()
-        
-        return BookingResponse(
-            booking_id=result['booking_id'],
-            status=result['status'],
-            confirmation_code=result.get('confirmation_code'),
-            message=result['message']
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    async def process():
+        try:
+            result = await get_agent().make_booking(
+                request.flight_id,
+                request.passenger_details
+            )
+
+            # Save booking to database
+            db_booking = Booking(
+                booking_id=result['booking_id'],
+                flight_id=request.flight_id,
+                booking_type='flight_only',
+                passenger_first_name=request.passenger_details.get('firstName'),
+                passenger_last_name=request.passenger_details.get('lastName'),
+                passenger_email=request.passenger_details.get('email'),
+                passenger_phone=request.passenger_details.get('phone'),
+                total_amount=0,  # Would come from flight details
+                status='confirmed',
+                confirmation_code=result.get('confirmation_code')
+            )
+            db.add(db_booking)
+            await idempotent_commit(db)
+
+            return BookingResponse(
+                booking_id=result['booking_id'],
+                status=result['status'],
+                confirmation_code=result.get('confirmation_code'),
+                message=result['message']
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await run_idempotent("book", idempotency_key, request.dict(), response, process)
+
+@router.post("/api/book-group", response_model=GroupBookingResponse)
+async def book_group(
+    request: GroupBookingRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    Book one flight / hotel selection for a whole group.
+    All Booking rows are written in one bulk insert and one transaction.
+    """
+    async def process():
+        try:
+            travel_planner = get_travel_planner()
+            results = await travel_planner.book_group(
+                request.flight_id,
+                request.passengers,
+                request.hotel_id,
+                request.hotel_details
+            )
+
+            flight_price = (request.flight_details or {}).get('price', 0)
+            hotel_amount = (request.hotel_details or {}).get('total_amount', 0)
+            group_id = str(uuid.uuid4())
+
+            rows = []
+            for result in results:
+                if result['status'] != 'confirmed':
+                    continue
+                passenger = request.passengers[result['index']]
+                rows.append({
+                    "booking_id": result['flight_booking']['booking_id'],
+                    "flight_id": request.flight_id,
+                    "hotel_id": request.hotel_id,
+                    "booking_type": 'group',
+                    "group_id": group_id,
+                    "passenger_first_name": passenger.get('firstName'),
+                    "passenger_last_name": passenger.get('lastName'),
+                    "passenger_email": passenger.get('email'),
+                    "passenger_phone": passenger.get('phone'),
+                    "flight_details": request.flight_details,
+                    "hotel_details": request.hotel_details,
+                    "total_amount": flight_price + hotel_amount,
+                    "currency": 'INR',
+                    "status": 'confirmed',
+                    "confirmation_code": result['flight_booking'].get('confirmation_code')
+                })
+
+            if rows:
+                try:
+                    await db.execute(insert(Booking), rows)
+                    await idempotent_commit(db)
+                except Exception:
+                    # Nothing was recorded, so release every seat and room reserved
+                    confirmed = [r for r in results if r['status'] == 'confirmed']
+                    await travel_planner.cancel_group_legs(
+                        [r['flight_booking'] for r in confirmed],
+                        [r.get('hotel_booking') for r in confirmed]
+                    )
+                    raise
+
+            booked = len(rows)
+            failed = len(results) - booked
+            return GroupBookingResponse(
+                group_id=group_id,
+                status='confirmed' if not failed else ('partial' if booked else 'failed'),
+                booked=booked,
+                failed=failed,
+                total_amount=sum(row['total_amount'] for row in rows),
+                results=[
+                    PassengerBookingResult(
+                        index=r['index'],
+                        status=r['status'],
+                        booking_id=r['flight_booking']['booking_id'] if r['status'] == 'confirmed' else None,
+                        confirmation_code=r['flight_booking'].get('confirmation_code') if r['status'] == 'confirmed' else None,
+                        hotel_booking_id=(r.get('hotel_booking') or {}).get('booking_id'),
+                        message=r.get('message')
+                    )
+                    for r in results
+                ]
+            )
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await run_idempotent("book-group", idempotency_key, request.dict(), response, process)
 
 @router.get("/api/history")
 async def get_search_history(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces offset"),
+    count: str = Query("exact", pattern="^(exact|approximate|none)$"),
     destination: Optional[str] = None,
     origin: Optional[str] = None,
     status: Optional[str] = None
@@ -165,30 +307,42 @@ async def get_search_history(
     """
     Get search history with filters and pagination
     """
+    # Items embed their bookings, so either table changing changes the page
+    not_modified = await check_not_modified(request, response, db, ["search_history", "bookings"])
+    if not_modified:
+        return not_modified
+    
     try:
         # Build query
-        query = db.query(SearchHistory)
+        query = select(SearchHistory)
         
         # Apply filters
         if destination:
-            query = query.filter(SearchHistory.destination.ilike(f"%{destination}%"))
+            query = query.where(SearchHistory.destination.ilike(f"%{destination}%"))
         if origin:
-            query = query.filter(SearchHistory.origin.ilike(f"%{origin}%"))
+            query = query.where(SearchHistory.origin.ilike(f"%{origin}%"))
         if status:
-            query = query.filter(SearchHistory.search_status == status)
+            query = query.where(SearchHistory.search_status == status)
         
         # Get total count
-        total = query.count()
+        totals = await count_rows(db, query, count)
         
         # Apply pagination and ordering
-        searches = query.order_by(SearchHistory.created_at.desc()).offset(offset).limit(limit).all()
+        searches, next_cursor = await fetch_page(db, query, SearchHistory, limit, offset, cursor)
+        
+        # Load bookings for the whole page in one query
+        bookings_by_search = {}
+        search_ids = [search.search_id for search in searches]
+        if search_ids:
+            bookings = (await db.execute(
+                select(Booking).where(Booking.search_id.in_(search_ids))
+            )).scalars().all()
+            for booking in bookings:
+                bookings_by_search.setdefault(booking.search_id, []).append(booking)
         
         # Convert to response format
         history_items = []
         for search in searches:
-            # Get related bookings
-            bookings = db.query(Booking).filter(Booking.search_id == search.search_id).all()
-            
             history_items.append({
                 "search_id": search.search_id,
                 "origin": search.origin,
@@ -206,43 +360,58 @@ async def get_search_history(
                         "confirmation_code": b.confirmation_code,
                         "status": b.status,
                         "total_amount": b.total_amount
-                    } for b in bookings
+                    } for b in bookings_by_search.get(search.search_id, [])
                 ]
             })
         
         return {
-            "total": total,
+            **totals,
             "limit": limit,
             "offset": offset,
+            "next_cursor": next_cursor,
             "items": history_items
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/api/bookings")
 async def get_bookings(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    status: Optional[str] = None
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces offset"),
+    count: str = Query("exact", pattern="^(exact|approximate|none)$"),
+    status: Optional[str] = None,
+    group_id: Optional[str] = None
 ):
     """
     Get all bookings with filters
     """
+    not_modified = await check_not_modified(request, response, db, ["bookings"])
+    if not_modified:
+        return not_modified
+    
     try:
-        query = db.query(Booking)
+        query = select(Booking)
         
         if status:
-            query = query.filter(Booking.status == status)
+            query = query.where(Booking.status == status)
+        if group_id:
+            query = query.where(Booking.group_id == group_id)
         
-        total = query.count()
-        bookings = query.order_by(Booking.created_at.desc()).offset(offset).limit(limit).all()
+        totals = await count_rows(db, query, count)
+        bookings, next_cursor = await fetch_page(db, query, Booking, limit, offset, cursor)
         
         booking_list = []
         for booking in bookings:
             booking_list.append({
                 "booking_id": booking.booking_id,
                 "booking_type": booking.booking_type,
+                "group_id": booking.group_id,
                 "passenger_name": f"{booking.passenger_first_name} {booking.passenger_last_name}",
                 "passenger_email": booking.passenger_email,
                 "flight_details": booking.flight_details,
@@ -255,11 +424,106 @@ async def get_bookings(
             })
         
         return {
-            "total": total,
+            **totals,
             "limit": limit,
             "offset": offset,
+            "next_cursor": next_cursor,
             "items": booking_list
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/api/export/{table}")
+async def export_table(
+    table: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start_date: Optional[date] = Query(None, description="First created_at day to include"),
+    end_date: Optional[date] = Query(None, description="Last created_at day to include")
+):
+    """
+    Stream a full export of bookings, search_history or travel_plans as NDJSON or CSV
+    """
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=400, detail=f"Unknown table; expected one of {sorted(EXPORT_TABLES)}")
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date is after end_date")
+    
+    filename = f"{table}-{start_date or 'all'}-{end_date or datetime.utcnow().date()}.{format}"
+    return StreamingResponse(
+        stream_export(table, format, start_date, end_date),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/api/text-search")
+async def text_search(
+    q: str = Query(..., min_length=2, description="Passenger name, email, confirmation code, city..."),
+    scope: str = Query("all", pattern="^(all|bookings|history)$"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Full-text search over bookings and search history, best matches first
+    """
+    if db.bind.dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Full-text search requires the SQLite FTS5 backend")
+    if not to_match_query(q):
+        raise HTTPException(status_code=400, detail="Query has no searchable words")
+    
+    try:
+        results = {}
+        if scope in ("all", "bookings"):
+            results["bookings"] = await fulltext.search_bookings(db, q, limit)
+        if scope in ("all", "history"):
+            results["history"] = await fulltext.search_history(db, q, limit)
+        return {"query": q, **results}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/api/analytics")
+async def get_analytics(
+    days: int = Query(30, ge=1, le=366),
+    top: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Top routes, searches per day, search-to-booking conversion and average
+    booking value, read from the daily rollups rather than the raw tables
+    """
+    if db.bind.dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Analytics rollups require the SQLite backend")
+    
+    try:
+        return await analytics.get_analytics(db, days, top)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/api/archive/{table}/{record_key}")
+async def get_archived_record(
+    table: str,
+    record_key: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Look up a row moved out of the live tables by the retention job
+    """
+    if table not in RETENTION_TABLES:
+        raise HTTPException(status_code=400, detail=f"Unknown table; expected one of {sorted(RETENTION_TABLES)}")
+    
+    record = await retention_job.lookup(db, table, record_key)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Record not found in archive")
+    return {"table": table, "record": record}
+
+@router.post("/api/admin/retention/run", dependencies=[Depends(require_admin)])
+async def run_retention():
+    """
+    Archive everything past its retention age now instead of waiting for the schedule
+    """
+    try:
+        return await asyncio.to_thread(retention_job.run_once)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -270,110 +534,315 @@ async def health_check():
     """
     return {"status": "healthy", "message": "Travel booking agent is running", "database": "SQLite"}
 
+@router.get("/api/ready")
+async def readiness_check(response: Response):
+    """
+    Readiness probe - 503 until startup warmup has finished, so load
+    balancers hold traffic while the model loads and caches fill
+    """
+    if not warmup.ready:
+        response.status_code = 503
+    return warmup.report()
+
+@router.get("/api/metrics")
+async def get_metrics():
+    """
+    Internal metrics for monitoring
+    """
+    return {
+        "write_behind": write_behind.metrics(),
+        "retention": retention_job.last_report,
+        "llm_circuit": get_llm_client().breaker.report()
+    }
+
 # Conversational endpoints
 
 @router.post("/api/chat", response_model=ChatResponse)
-async def chat_with_agent(request: ChatRequest):
+async def chat_with_agent(request: ChatRequest, db: AsyncSession = Depends(get_async_db)):
     """
-    Conversational endpoint for travel planning
+    Conversational endpoint for travel planning.
+    History lives server-side: each turn sends only the new message and
+    gets back only the extracted info that changed.
     """
-    try:
-        user_message = request.message
-        conversation_history = request.conversation_history
-        extracted_info = request.extracted_info or {}
-        
-        # Extract information from user message
-        updated_info = await llm_client.extract_travel_info(user_message, extracted_info)
-        
-        # Check if we have enough information
-        required_fields = ['destination', 'budget', 'days']
-        has_all_info = all(updated_info.get(field) for field in required_fields)
-        
-        # Generate response
-        if has_all_info:
-            ai_message = "Perfect! I have all the information I need. Let me create an amazing travel plan for you! 🌟"
-        else:
-            ai_message = await llm_client.generate_next_question(updated_info)
-        
-        # Update conversation history
-        updated_history = conversation_history + [
-            ChatMessage(role="user", content=user_message, timestamp=datetime.now().isoformat()),
-            ChatMessage(role="ai", content=ai_message, timestamp=datetime.now().isoformat())
-        ]
-        
-        return ChatResponse(
-            message=ai_message,
-            extracted_info=updated_info,
-            is_ready_to_plan=has_all_info,
-            conversation_history=updated_history
+    conversation_id = request.conversation_id
+    if conversation_id is None:
+        conversation_id = await conversation_store.create(
+            db,
+            [m.dict() for m in request.conversation_history],
+            request.extracted_info
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    
+    async with conversation_store.turn(db, conversation_id) as session:
+        try:
+            user_message = request.message
+            extracted_info = session["extracted_info"]
+            
+            # Extract information from user message
+            updated_info = await get_llm_client().extract_travel_info(user_message, extracted_info)
+            
+            # Check if we have enough information
+            required_fields = ['destination', 'budget', 'days']
+            has_all_info = all(updated_info.get(field) for field in required_fields)
+            
+            # Generate response
+            if has_all_info:
+                ai_message = "Perfect! I have all the information I need. Let me create an amazing travel plan for you! 🌟"
+            else:
+                ai_message = await get_llm_client().generate_next_question(
+                    updated_info, session["messages"], state=updated_info
+                )
+            
+            message_count = await conversation_store.append_turn(
+                db, conversation_id, user_message, ai_message, updated_info, has_all_info
+            )
+            
+            return ChatResponse(
+                conversation_id=conversation_id,
+                message=ai_message,
+                extracted_info_delta=info_delta(extracted_info, updated_info),
+                is_ready_to_plan=has_all_info,
+                message_count=message_count
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/api/plan-travel", response_model=TravelPlan)
-async def create_travel_plan(request: TravelPlanRequest, db: Session = Depends(get_db)):
+async def create_travel_plan(request: TravelPlanRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Create a complete travel plan with flights, hotels, and itinerary
     """
     try:
         travel_info = request.dict()
-        plan = await travel_planner.create_complete_plan(travel_info)
+        plan = await get_travel_planner().create_complete_plan(travel_info)
         
         # Save plan to database
-        plan_id = str(uuid.uuid4())
-        db_plan = DBTravelPlan(
-            plan_id=plan_id,
-            destination=plan['destination'],
-            origin=plan['origin'],
-            departure_date=plan['departure_date'],
-            return_date=plan['return_date'],
-            days=plan['days'],
-            passengers=plan['passengers'],
-            budget=plan['budget'],
-            total_cost=plan['total_cost'],
-            remaining_budget=plan['remaining_budget'],
-            interests=plan['interests'],
-            plan_json=plan,
-            is_booked=0
-        )
-        db.add(db_plan)
-        db.commit()
+        await save_travel_plan(db, plan)
         
         return TravelPlan(**plan)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/api/book-complete-plan", response_model=CompletePlanBookingResponse)
-async def book_complete_plan(request: CompletePlanBookingRequest, db: Session = Depends(get_db)):
+@router.post("/api/plan-travel/batch")
+async def create_travel_plans_batch(request: BatchTravelPlanRequest, http_request: Request):
     """
-    Book the complete travel plan (flight + hotel)
+    Plan trips for a whole group at once.
+    Streams one NDJSON line per plan as it completes, then an aggregate cost report.
+    """
+    if len(request.requests) > settings.batch_plan_max_requests:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.batch_plan_max_requests} plans per batch; split the group into smaller batches"
+        )
+    
+    travel_infos = [r.dict() for r in request.requests]
+    unique_plans = len({json.dumps(info, sort_keys=True, default=str) for info in travel_infos})
+    await rate_limiter.charge(http_request, unique_plans * BATCH_PLAN_COST_PER_REQUEST)
+    max_concurrency = request.max_concurrency or settings.batch_plan_concurrency
+    
+    async def stream_plans():
+        started = time.perf_counter()
+        search_cache = {}
+        plans = []
+        failed = 0
+        
+        async with AsyncSessionLocal() as db:
+            async for index, plan, error in get_travel_planner().create_batch_plans(travel_infos, max_concurrency, search_cache):
+                if error:
+                    failed += 1
+                    yield json.dumps({"type": "error", "index": index, "detail": error}) + "\n"
+                    continue
+                
+                plan_id = await save_travel_plan(db, plan)
+                plans.append(plan)
+                yield json.dumps({
+                    "type": "plan",
+                    "index": index,
+                    "plan_id": plan_id,
+                    "plan": TravelPlan(**plan).dict()
+                }) + "\n"
+        
+        by_destination = {}
+        for plan in plans:
+            entry = by_destination.setdefault(plan['destination'], {"plans": 0, "total_cost": 0})
+            entry["plans"] += 1
+            entry["total_cost"] += plan['total_cost']
+        
+        total_cost = sum(p['total_cost'] for p in plans)
+        yield json.dumps({
+            "type": "report",
+            "requested": len(travel_infos),
+            "succeeded": len(plans),
+            "failed": failed,
+            "total_budget": sum(p['budget'] for p in plans),
+            "total_cost": total_cost,
+            "average_cost": total_cost / len(plans) if plans else 0,
+            "over_budget": sum(1 for p in plans if p['remaining_budget'] < 0),
+            "by_destination": by_destination,
+            "unique_searches": len(search_cache),
+            "elapsed_seconds": round(time.perf_counter() - started, 3)
+        }) + "\n"
+    
+    return StreamingResponse(stream_plans(), media_type="application/x-ndjson")
+
+@router.post("/api/plan-travel/compare", response_model=CompareDestinationsResponse)
+async def compare_travel_plans(request: CompareDestinationsRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Plan the same trip to several destinations and rank them side by side
     """
     try:
-        plan = request.plan.dict()
-        passenger_details = request.passenger_details
+        travel_info = request.dict(exclude={'destinations'})
+        candidates, failures = await get_travel_planner().compare_destinations(travel_info, request.destinations)
         
-        result = await travel_planner.book_complete_plan(plan, passenger_details)
+        ranked = []
+        for candidate in candidates:
+            plan_id = await save_travel_plan(db, candidate['plan'])
+            ranked.append(DestinationCandidate(**candidate, plan_id=plan_id))
         
-        # Save booking to database
-        db_booking = Booking(
-            booking_id=result['flight_booking']['booking_id'],
-            flight_id=plan['flight']['flight_id'],
-            hotel_id=plan['hotel']['hotel_id'],
-            booking_type='complete_plan',
-            passenger_first_name=passenger_details.get('firstName'),
-            passenger_last_name=passenger_details.get('lastName'),
-            passenger_email=passenger_details.get('email'),
-            passenger_phone=passenger_details.get('phone'),
-            flight_details=plan['flight'],
-            hotel_details=plan['hotel'],
-            total_amount=plan['total_cost'],
-            currency='INR',
-            status='confirmed',
-            confirmation_code=result['flight_booking'].get('confirmation_code')
+        return CompareDestinationsResponse(
+            candidates=ranked,
+            recommended=ranked[0].destination if ranked else "",
+            failed=[DestinationFailure(**failure) for failure in failures]
         )
-        db.add(db_booking)
-        db.commit()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/api/plans/{plan_id}")
+async def get_travel_plan(
+    plan_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get a saved plan, falling back to the archive once retention has moved it
+    """
+    not_modified = await check_not_modified(request, response, db, ["travel_plans"])
+    if not_modified:
+        return not_modified
+    
+    db_plan = (await db.execute(
+        select(DBTravelPlan.plan_json, DBTravelPlan.is_booked, DBTravelPlan.booking_id)
+        .where(DBTravelPlan.plan_id == plan_id)
+    )).first()
+    if db_plan:
+        plan_json, is_booked, booking_id = db_plan
+    else:
+        archived = await retention_job.lookup(db, "travel_plans", plan_id)
+        if archived is None:
+            raise HTTPException(status_code=404, detail="Plan not found")
+        plan_json, is_booked, booking_id = archived["plan_json"], archived["is_booked"], archived["booking_id"]
+    
+    return {
+        "plan_id": plan_id,
+        "is_booked": bool(is_booked),
+        "booking_id": booking_id,
+        "plan": plan_json
+    }
+
+@router.post("/api/plans/{plan_id}/replan", response_model=ReplanResponse)
+async def replan_travel(plan_id: str, request: ReplanRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Adjust a saved plan, reusing every part the change doesn't affect.
+    Plans moved to the archive by retention can be re-planned too.
+    """
+    plan_json = (await db.execute(
+        select(DBTravelPlan.plan_json).where(DBTravelPlan.plan_id == plan_id)
+    )).scalar()
+    if plan_json is None:
+        archived = await retention_job.lookup(db, "travel_plans", plan_id)
+        if archived is None:
+            raise HTTPException(status_code=404, detail="Plan not found")
+        plan_json = archived["plan_json"]
+    
+    try:
+        plan, recomputed = await get_travel_planner().replan(plan_json, request.dict(exclude_none=True))
+        new_plan_id = await save_travel_plan(db, plan)
         
-        return CompletePlanBookingResponse(**result)
+        return ReplanResponse(
+            plan_id=new_plan_id,
+            previous_plan_id=plan_id,
+            recomputed=recomputed,
+            plan=TravelPlan(**plan)
+        )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/api/book-complete-plan", response_model=CompletePlanBookingResponse)
+async def book_complete_plan(
+    request: CompletePlanBookingRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    Book the complete travel plan (flight + hotel)
+    """
+    async def process():
+        try:
+            plan = request.plan.dict()
+            passenger_details = request.passenger_details
+
+            travel_planner = get_travel_planner()
+            result = await travel_planner.book_complete_plan(plan, passenger_details)
+
+            if result['status'] != 'success':
+                raise HTTPException(status_code=502, detail=result['message'])
+
+            # Save booking to database
+            db_booking = Booking(
+                booking_id=result['flight_booking']['booking_id'],
+                flight_id=plan['flight']['flight_id'],
+                hotel_id=plan['hotel']['hotel_id'],
+                booking_type='complete_plan',
+                passenger_first_name=passenger_details.get('firstName'),
+                passenger_last_name=passenger_details.get('lastName'),
+                passenger_email=passenger_details.get('email'),
+                passenger_phone=passenger_details.get('phone'),
+                flight_details=plan['flight'],
+                hotel_details=plan['hotel'],
+                total_amount=plan['total_cost'],
+                currency='INR',
+                status='confirmed',
+                confirmation_code=result['flight_booking'].get('confirmation_code')
+            )
+            db.add(db_booking)
+            # The saga completes in the same commit as the booking row; if
+            # either fails, both supplier legs are cancelled
+            try:
+                if not await travel_planner.saga.complete(db, result['saga_id']):
+                    raise RuntimeError("Booking saga was already rolled back")
+                await idempotent_commit(db)
+            except Exception as e:
+                await db.rollback()
+                await travel_planner.saga.abort(result['saga_id'], f"Booking record not saved: {e}")
+                raise
+
+            return CompletePlanBookingResponse(**result)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await run_idempotent("book-complete-plan", idempotency_key, request.dict(), response, process)
+
+async def save_travel_plan(db: AsyncSession, plan: dict) -> str:
+    """Persist a generated plan and return its plan_id"""
+    plan_id = str(uuid.uuid4())
+    db_plan = DBTravelPlan(
+        plan_id=plan_id,
+        destination=plan['destination'],
+        origin=plan['origin'],
+        departure_date=plan['departure_date'],
+        return_date=plan['return_date'],
+        days=plan['days'],
+        passengers=plan['passengers'],
+        budget=plan['budget'],
+        total_cost=plan['total_cost'],
+        remaining_budget=plan['remaining_budget'],
+        interests=plan['interests'],
+        plan_json=plan,
+        is_booked=0
+    )
+    db.add(db_plan)
+    await db.commit()
+    return plan_id
\ No newline at end of file
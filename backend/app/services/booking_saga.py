@@ -0,0 +1,202 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.db_models import BookingSaga
+from app.services.flight_api import FlightAPI
+from app.services.hotel_api import HotelAPI
+
+settings = get_settings()
+
+class SagaCoordinator:
+    """
+    Books the flight and hotel of a plan concurrently. If one leg fails the
+    other is cancelled. Every transition is written to booking_sagas; a saga
+    only becomes 'completed' in the same transaction that stores its Booking
+    row (see complete()), and recovery compensates sagas left unfinished
+    for longer than saga_lease_seconds.
+    """
+
+    def __init__(self, flight_api: FlightAPI, hotel_api: HotelAPI):
+        self.flight_api = flight_api
+        self.hotel_api = hotel_api
+        self.lease_seconds = settings.saga_lease_seconds
+        self._task: asyncio.Task = None
+
+    async def _record(self, saga_id: str, **fields):
+        """Persist a saga transition"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(BookingSaga).where(BookingSaga.saga_id == saga_id).values(**fields))
+            await db.commit()
+
+    async def _reserve(self, saga_id: str, leg: str, call) -> Any:
+        """Await one supplier leg and record its outcome as soon as it lands"""
+        try:
+            result = await call
+        except Exception as e:
+            await self._record(saga_id, **{f'{leg}_status': 'failed'})
+            return e
+        await self._record(saga_id, **{f'{leg}_status': 'booked', f'{leg}_booking': result})
+        return result
+
+    async def book_plan(self, plan: Dict[str, Any], passenger_details: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reserve both legs in parallel and compensate on partial failure.
+        On success the saga stays open until the caller stores the booking
+        and calls complete(), or abort() if that fails.
+        """
+        saga_id = str(uuid.uuid4())
+        async with AsyncSessionLocal() as db:
+            db.add(BookingSaga(
+                saga_id=saga_id,
+                status='started',
+                plan_json=plan,
+                passenger_details=passenger_details
+            ))
+            await db.commit()
+
+        hotel_booking_details = {
+            **passenger_details,
+            'check_in': plan['departure_date'],
+            'check_out': plan['return_date'],
+            'total_amount': plan['hotel']['price_per_night'] * plan['days']
+        }
+
+        flight_result, hotel_result = await asyncio.gather(
+            self._reserve(saga_id, 'flight', self.flight_api.book_flight(plan['flight']['flight_id'], passenger_details)),
+            self._reserve(saga_id, 'hotel', self.hotel_api.book_hotel(plan['hotel']['hotel_id'], hotel_booking_details))
+        )
+
+        flight_ok = not isinstance(flight_result, Exception)
+        hotel_ok = not isinstance(hotel_result, Exception)
+
+        if flight_ok and hotel_ok:
+            return {
+                'saga_id': saga_id,
+                'status': 'success',
+                'flight_booking': flight_result,
+                'hotel_booking': hotel_result
+            }
+
+        errors = [str(r) for r in (flight_result, hotel_result) if isinstance(r, Exception)]
+        error = '; '.join(errors)
+        await self._record(saga_id, status='compensating', error=error)
+        await self._compensate(
+            saga_id,
+            flight_result if flight_ok else None,
+            hotel_result if hotel_ok else None
+        )
+
+        return {
+            'saga_id': saga_id,
+            'status': 'failed',
+            'flight_booking': {},
+            'hotel_booking': {},
+            'message': f"Booking failed and was rolled back: {error}"
+        }
+
+    async def _compensate(self, saga_id: str, flight_booking: Dict[str, Any], hotel_booking: Dict[str, Any]):
+        """Cancel every leg that was booked, then close the saga"""
+        try:
+            if flight_booking:
+                await self.flight_api.cancel_booking(flight_booking['booking_id'])
+                await self._record(saga_id, flight_status='cancelled')
+            if hotel_booking:
+                await self.hotel_api.cancel_booking(hotel_booking['booking_id'])
+                await self._record(saga_id, hotel_status='cancelled')
+            await self._record(saga_id, status='compensated')
+        except Exception as e:
+            # Left in 'compensating' so the next recovery pass retries it
+            print(f"Compensation failed for saga {saga_id}: {e}")
+
+    async def complete(self, db: AsyncSession, saga_id: str) -> bool:
+        """
+        Mark the saga completed as part of the caller's transaction, so it
+        commits together with the Booking row. False if recovery has already
+        claimed the saga for compensation.
+        """
+        result = await db.execute(
+            update(BookingSaga)
+            .where(BookingSaga.saga_id == saga_id, BookingSaga.status == 'started')
+            .values(status='completed')
+        )
+        return result.rowcount == 1
+
+    async def abort(self, saga_id: str, error: str) -> bool:
+        """Compensate a successful reservation whose booking could not be stored"""
+        return await self._claim_and_compensate(saga_id, error)
+
+    async def _claim_and_compensate(self, saga_id: str, error: str, cutoff: Optional[datetime] = None) -> bool:
+        """
+        Move the saga to 'compensating' and cancel its booked legs. The
+        status check in the UPDATE means only one worker claims a saga.
+        """
+        async with AsyncSessionLocal() as db:
+            claim = (
+                update(BookingSaga)
+                .where(BookingSaga.saga_id == saga_id, BookingSaga.status.in_(['started', 'compensating']))
+                .values(status='compensating', error=error)
+            )
+            if cutoff is not None:
+                claim = claim.where(BookingSaga.updated_at < cutoff)
+            if (await db.execute(claim)).rowcount != 1:
+                return False
+            await db.commit()
+            saga = (await db.execute(select(BookingSaga).where(BookingSaga.saga_id == saga_id))).scalars().one()
+            flight_booking = saga.flight_booking if saga.flight_status == 'booked' else None
+            hotel_booking = saga.hotel_booking if saga.hotel_status == 'booked' else None
+
+        await self._compensate(saga_id, flight_booking, hotel_booking)
+        return True
+
+    async def recover(self) -> int:
+        """
+        Compensate sagas nobody has touched for lease_seconds - their worker
+        crashed or lost the request, and the client never received a
+        confirmation, so any booked leg is cancelled and the retry books
+        afresh. Sagas still within the lease may belong to a live worker
+        and are left alone. Returns the number of sagas resolved.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        async with AsyncSessionLocal() as db:
+            saga_ids = (await db.execute(
+                select(BookingSaga.saga_id).where(
+                    BookingSaga.status.in_(['started', 'compensating']),
+                    BookingSaga.updated_at < cutoff
+                )
+            )).scalars().all()
+
+        recovered = 0
+        for saga_id in saga_ids:
+            if await self._claim_and_compensate(saga_id, 'Interrupted before completion', cutoff):
+                recovered += 1
+
+        if recovered:
+            print(f"Recovered {recovered} interrupted booking saga(s)")
+        return recovered
+
+    def start(self):
+        """Run recovery now and then once per lease period (call from app startup)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.recover()
+            except Exception as e:
+                print(f"Saga recovery failed: {e}")
+            await asyncio.sleep(self.lease_seconds)
@@ -0,0 +1,113 @@
+import json
+import math
+from typing import Any, Dict, List, Optional
+from app.config import get_settings
+
+settings = get_settings()
+
+# Ollama's tokenizer is not exposed, so tokens are estimated at ~4 characters
+# each (close for English with Llama-family tokenizers) plus a small per-message
+# overhead for the chat template.
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+ROLE_MAP = {"ai": "assistant"}
+
+class ContextManager:
+    """
+    Builds the message list for one LLM call within a fixed token window.
+    The newest turns are sent verbatim; older turns are folded into a
+    compact state message (known trip details plus a rolling digest of
+    earlier user requests). Caller-owned lists and dicts are never modified.
+    """
+
+    def __init__(self, window_tokens: int, reserve_tokens: int, summary_tokens: int):
+        self.window_tokens = window_tokens
+        self.reserve_tokens = reserve_tokens
+        self.summary_tokens = summary_tokens
+
+    @staticmethod
+    def count_tokens(text: str) -> int:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    def message_tokens(self, message: Dict[str, str]) -> int:
+        return self.count_tokens(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        return text if len(text) <= max_chars else text[:max_chars - 3] + "..."
+
+    def summarize(self, dropped: List[Dict[str, str]], state: Optional[Dict[str, Any]]) -> Optional[Dict[str, str]]:
+        """
+        Compact state for turns that no longer fit: the structured state as
+        JSON, then the most recent earlier user requests that fit in
+        summary_tokens.
+        """
+        if not dropped and not state:
+            return None
+
+        header = "Conversation so far (summarised)."
+        parts = [header]
+        if state:
+            parts.append(f"Known trip details: {json.dumps(state, default=str)}")
+
+        # 8 tokens cover the "Earlier the user said:" label
+        budget = self.summary_tokens - sum(self.count_tokens(p) + 1 for p in parts) - 8
+        requests = []
+        for message in reversed(dropped):
+            if budget <= 0:
+                break
+            if message.get("role") != "user":
+                continue
+            line = self._truncate(message.get("content", "").strip(), min(budget, 40))
+            budget -= self.count_tokens(line) + 1
+            requests.append(line)
+        if requests:
+            parts.append("Earlier the user said: " + " | ".join(reversed(requests)))
+
+        return {"role": "system", "content": self._truncate(" ".join(parts), self.summary_tokens)}
+
+    def build(
+        self,
+        prompt: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        state: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, str]]:
+        """
+        New message list for the call: [summary], recent history..., prompt.
+        Room for the summary is reserved first whenever one can be produced;
+        the prompt is truncated only if it alone exceeds what is left.
+        """
+        budget = self.window_tokens - self.reserve_tokens
+        if history or state:
+            budget -= self.summary_tokens + MESSAGE_OVERHEAD_TOKENS
+        prompt_message = {"role": "user", "content": self._truncate(prompt, budget - MESSAGE_OVERHEAD_TOKENS)}
+        budget -= self.message_tokens(prompt_message)
+
+        history = [
+            {"role": ROLE_MAP.get(m.get("role"), m.get("role")), "content": m.get("content", "")}
+            for m in (history or [])
+        ]
+
+        # Keep whole turns from the newest backwards while they fit
+        kept = len(history)
+        while kept > 0 and budget - self.message_tokens(history[kept - 1]) >= 0:
+            kept -= 1
+            budget -= self.message_tokens(history[kept])
+
+        messages = []
+        summary = self.summarize(history[:kept], state)
+        if summary:
+            messages.append(summary)
+        messages.extend(history[kept:])
+        messages.append(prompt_message)
+        return messages
+
+    def total_tokens(self, messages: List[Dict[str, str]]) -> int:
+        return sum(self.message_tokens(m) for m in messages)
+
+context_manager = ContextManager(
+    settings.llm_context_window_tokens,
+    settings.llm_response_reserve_tokens,
+    settings.llm_summary_max_tokens
+)
@@ -76,4 +76,31 @@ class FlightAPI:
             "confirmation_code": f"{''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', k=6))}",
             "status": "confirmed",
             "message": "Booking successful! Confirmation email sent."
+        }
+    
+    async def book_flight_batch(self, flight_id: str, passengers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Book several passengers on one flight in a single supplier call (mock implementation).
+        Returns one result per passenger, in order.
+        """
+        pnr = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', k=6))
+        booking_numbers = random.sample(range(10000, 100000), len(passengers))
+        return [
+            {
+                "booking_id": f"BK{number}",
+                "confirmation_code": pnr,
+                "status": "confirmed",
+                "message": "Booking successful! Confirmation email sent."
+            }
+            for number in booking_numbers
+        ]
+    
+    async def cancel_booking(self, booking_id: str) -> Dict[str, Any]:
+        """
+        Cancel a flight booking (mock implementation)
+        """
+        return {
+            "booking_id": booking_id,
+            "status": "cancelled",
+            "message": "Flight booking cancelled."
         }
\ No newline at end of file
@@ -1,3 +1,4 @@
+import asyncio
 import random
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
@@ -132,4 +133,31 @@ class HotelAPI:
             "check_out": booking_details.get('check_out'),
             "guest_name": f"{booking_details.get('firstName', '')} {booking_details.get('lastName', '')}",
             "total_amount": booking_details.get('total_amount', 0)
+        }
+    
+    async def book_hotel_batch(self, hotel_id: str, guests: List[Dict[str, Any]], booking_details: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Book rooms for several guests (mock implementation). The hotel
+        supplier has no batch endpoint, so this issues one book_hotel call
+        per guest, concurrently. Returns one result per guest, in order; a
+        guest whose call raised gets a failed result so the rooms booked for
+        the others are still reported (and can be cancelled).
+        """
+        outcomes = await asyncio.gather(*[
+            self.book_hotel(hotel_id, {**booking_details, **guest})
+            for guest in guests
+        ], return_exceptions=True)
+        return [
+            {"status": "failed", "message": f"Hotel booking failed: {outcome}"} if isinstance(outcome, Exception) else outcome
+            for outcome in outcomes
+        ]
+    
+    async def cancel_booking(self, booking_id: str) -> Dict[str, Any]:
+        """
+        Cancel a hotel booking (mock implementation)
+        """
+        return {
+            "booking_id": booking_id,
+            "status": "cancelled",
+            "message": "Hotel booking cancelled."
         }
\ No newline at end of file
@@ -0,0 +1,184 @@
+import asyncio
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+from sqlalchemy import select
+from app.database import AsyncSessionLocal
+from app.db_models import ItineraryCache
+from app.services.llm_client import LLMClient
+
+TEMPLATES_PATH = Path(__file__).resolve().parent.parent / "data" / "itinerary_templates.json"
+SLOTS = ('morning', 'afternoon', 'evening')
+
+
+@lru_cache()
+def load_templates() -> Dict[str, Any]:
+    """
+    Load and precompile the itinerary store once per process.
+    Activity pools become tuples keyed by lower-cased destination / interest.
+    """
+    with open(TEMPLATES_PATH, encoding="utf-8") as f:
+        raw = json.load(f)
+
+    return {
+        'default': {slot: tuple(raw['default'][slot]) for slot in SLOTS},
+        'destinations': {
+            destination.lower(): {
+                interest.lower(): {slot: tuple(pool[slot]) for slot in SLOTS}
+                for interest, pool in interests.items()
+            }
+            for destination, interests in raw['destinations'].items()
+        }
+    }
+
+
+class ItineraryEngine:
+    """
+    Builds day-wise itineraries from the template store, blending every
+    matching interest. Destinations without templates are generated by the
+    LLM once per (destination, interests, days) and cached in the DB.
+    """
+
+    def __init__(self):
+        self.templates = load_templates()
+        self.llm = LLMClient()
+        self._memory: Dict[str, List[Dict[str, str]]] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def cache_key(destination: str, interests: List[str], days: int) -> str:
+        """Order-insensitive key for an itinerary profile"""
+        interest_key = ','.join(sorted({i.lower() for i in interests}))
+        return f"{destination.lower()}|{interest_key}|{days}"
+
+    def interest_coverage(self, destination: str, interests: List[str]) -> float:
+        """Share of the requested interests the template store covers for a destination"""
+        pools = self.templates['destinations'].get(destination.lower(), {})
+        if not interests:
+            return 1.0 if pools else 0.5
+        return sum(1 for i in interests if i.lower() in pools) / len(interests)
+
+    async def generate(self, destination: str, days: int, interests: List[str]) -> List[Dict[str, Any]]:
+        """
+        Generate day-wise itinerary based on destination and interests
+        """
+        dest_lower = destination.lower()
+
+        if dest_lower in self.templates['destinations']:
+            day_plans = self._fill_from_templates(self.templates['destinations'][dest_lower], days, interests)
+        else:
+            day_plans = await self._cached_llm_itinerary(destination, days, interests)
+
+        return [
+            {
+                'day': day,
+                'title': f'Day {day} - {destination}',
+                'activities': activities
+            }
+            for day, activities in enumerate(day_plans, start=1)
+        ]
+
+    def _fill_from_templates(
+        self,
+        destination_pools: Dict[str, Dict[str, Tuple[str, ...]]],
+        days: int,
+        interests: List[str]
+    ) -> List[Dict[str, str]]:
+        """
+        Fill days * slots by rotating through the matching interest pools so
+        consecutive slots alternate interests, without repeating an activity
+        until its pool runs out
+        """
+        pools = [destination_pools[i.lower()] for i in interests if i.lower() in destination_pools]
+        if not pools:
+            pools = list(destination_pools.values()) or [self.templates['default']]
+
+        cursors = [{slot: 0 for slot in SLOTS} for _ in pools]
+        day_plans = []
+        turn = 0
+        for _ in range(days):
+            activities = {}
+            for slot in SLOTS:
+                index = turn % len(pools)
+                pool = pools[index][slot]
+                activities[slot] = pool[cursors[index][slot] % len(pool)]
+                cursors[index][slot] += 1
+                turn += 1
+            day_plans.append(activities)
+
+        return day_plans
+
+    def _fill_default(self, days: int) -> List[Dict[str, str]]:
+        """Generic sightseeing days, used when the LLM cannot help"""
+        default = self.templates['default']
+        return [
+            {slot: default[slot][day % len(default[slot])] for slot in SLOTS}
+            for day in range(days)
+        ]
+
+    async def _cached_llm_itinerary(self, destination: str, days: int, interests: List[str]) -> List[Dict[str, str]]:
+        """
+        Look the profile up in memory, then in the DB, and only then ask the LLM.
+        Concurrent requests for the same profile share a single LLM call.
+        """
+        key = self.cache_key(destination, interests, days)
+        if key in self._memory:
+            return self._memory[key]
+
+        # Every caller awaits the same task, which is only forgotten once it
+        # has finished - by then the result is in self._memory (or was a
+        # failed generation that should be retried)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load_or_generate(key, destination, days, interests))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one caller disconnecting must not cancel the others' generation
+        return await asyncio.shield(task)
+
+    async def _load_or_generate(self, key: str, destination: str, days: int, interests: List[str]) -> List[Dict[str, str]]:
+        day_plans = await self._load_cached(key)
+        if day_plans is None:
+            day_plans = await self.llm.generate_itinerary(destination, days, interests)
+            if len(day_plans) != days:
+                # Don't cache a failed or partial generation
+                return self._fill_default(days)
+            await self._store_cached(key, destination, interests, days, day_plans)
+
+        self._memory[key] = day_plans
+        return day_plans
+
+    async def prime(self, destinations: List[str]) -> int:
+        """Load the stored itineraries of these destinations into memory; returns how many"""
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(ItineraryCache.cache_key, ItineraryCache.itinerary)
+                .where(ItineraryCache.destination.in_([d.lower() for d in destinations]))
+            )).all()
+        for key, itinerary in rows:
+            self._memory.setdefault(key, itinerary)
+        return len(rows)
+
+    async def _load_cached(self, key: str):
+        """Read a cached itinerary from the DB, or None"""
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(select(ItineraryCache).where(ItineraryCache.cache_key == key))).scalars().first()
+            return row.itinerary if row else None
+
+    async def _store_cached(self, key: str, destination: str, interests: List[str], days: int, day_plans: List[Dict[str, str]]):
+        """Persist a generated itinerary so later plans skip the LLM"""
+        async with AsyncSessionLocal() as db:
+            db.add(ItineraryCache(
+                cache_key=key,
+                destination=destination.lower(),
+                interests=sorted({i.lower() for i in interests}),
+                days=days,
+                itinerary=day_plans
+            ))
+            try:
+                await db.commit()
+            except Exception as e:
+                # Another worker stored the same profile first
+                await db.rollback()
+                print(f"Itinerary cache write skipped for {key}: {e}")
@@ -1,36 +1,151 @@
-import ollama
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 from app.config import get_settings
+from app.circuit_breaker import CircuitBreaker
+from app.services.context_manager import context_manager
 import json
 import re
+import time
 
 settings = get_settings()
 
+class LLMUnavailable(Exception):
+    """Raised instead of calling Ollama while the circuit breaker is open"""
+
+@lru_cache()
+def get_ollama_client(timeout: Optional[float]):
+    """
+    Shared async Ollama client. The timeout is enforced by its HTTP
+    transport, so a slow or hung Ollama has the request itself aborted
+    instead of leaving a worker thread blocked on it.
+    """
+    from ollama import AsyncClient  # deferred to first use - it pulls in httpx and its own models
+    return AsyncClient(host=settings.ollama_host, timeout=timeout)
+
+async def _probe_ollama():
+    """One-token completion - cheap enough to poll while the circuit is open"""
+    await get_ollama_client(settings.llm_timeout_seconds).chat(
+        model=settings.ollama_model,
+        messages=[{"role": "user", "content": "Reply with OK"}],
+        keep_alive=settings.ollama_keep_alive,
+        options={"num_predict": 1}
+    )
+
+# Shared by every LLMClient - they all talk to the same Ollama
+llm_breaker = CircuitBreaker(
+    "ollama",
+    probe=_probe_ollama,
+    window=settings.llm_breaker_window,
+    min_calls=settings.llm_breaker_min_calls,
+    error_rate=settings.llm_breaker_error_rate,
+    slow_call_seconds=settings.llm_breaker_slow_call_seconds,
+    slow_call_rate=settings.llm_breaker_slow_call_rate,
+    probe_interval=settings.llm_breaker_probe_interval_seconds
+)
+
+# Used when the circuit is open or a completion fails, so users get a
+# plain answer right away instead of an error string or a timeout
+FALLBACK_TEMPLATES = {
+    "search_intent": (
+        "Searching {cabin_class} flights from {origin} to {destination} on {departure_date} "
+        "for {passengers} passenger(s). Comparing price, stops and departure times to find the best option."
+    ),
+    "search_summary": (
+        "Found {count} flights ranging from {currency} {min_price:,.0f} to {currency} {max_price:,.0f} "
+        "across {airlines}. The cheapest is {cheapest_airline} {cheapest_flight} at {currency} {cheapest_price:,.0f} "
+        "with {cheapest_stops} stop(s)."
+    ),
+    "plan_summary": (
+        "Your {days}-day trip to {destination} comes to ₹{total_cost:,.0f} of your ₹{budget:,.0f} budget: "
+        "fly {airline} {flight_number} and stay at {hotel} ({rating}★), with days planned around {interests}."
+    ),
+}
+
+NEXT_QUESTION_TEMPLATES = {
+    "destination": "Where would you like to travel to?",
+    "budget": "What's your total budget for the trip to {destination}?",
+    "days": "How many days would you like to spend in {destination}?",
+    "interests": "What do you enjoy most when you travel - beaches, food, culture, adventure or something else?",
+}
+
 class LLMClient:
     def __init__(self):
         self.model = settings.ollama_model
         self.host = settings.ollama_host
+        self.breaker = llm_breaker
     
-    async def generate_response(self, prompt: str, context: List[Dict[str, str]] = None) -> str:
+    async def _complete(
+        self,
+        prompt: str,
+        context: List[Dict[str, str]] = None,
+        state: Optional[Dict[str, Any]] = None
+    ) -> str:
         """
-        Generate a response from the LLM
+        One completion through the circuit breaker. Raises LLMUnavailable
+        while the circuit is open, otherwise whatever the call raised,
+        including a timeout after llm_timeout_seconds.
         """
+        if not self.breaker.allow():
+            raise LLMUnavailable(f"circuit open ({self.breaker.open_reason})")
+        
+        messages = context_manager.build(prompt, context, state)
+        started = time.perf_counter()
         try:
-            messages = context or []
-            messages.append({
-                "role": "user",
-                "content": prompt
-            })
-            
-            response = ollama.chat(
+            response = await get_ollama_client(settings.llm_timeout_seconds).chat(
                 model=self.model,
-                messages=messages
+                messages=messages,
+                keep_alive=settings.ollama_keep_alive
             )
-            
-            return response['message']['content']
+        except Exception:
+            self.breaker.record(False, time.perf_counter() - started)
+            raise
+        self.breaker.record(True, time.perf_counter() - started)
+        return response['message']['content']
+    
+    async def _complete_or_fallback(
+        self,
+        prompt: str,
+        fallback: str,
+        context: List[Dict[str, str]] = None,
+        state: Optional[Dict[str, Any]] = None
+    ) -> str:
+        try:
+            return (await self._complete(prompt, context, state)).strip()
+        except LLMUnavailable:
+            return fallback
+        except Exception as e:
+            print(f"LLM call failed, using template response: {e!r}")
+            return fallback
+    
+    async def generate_response(
+        self,
+        prompt: str,
+        context: List[Dict[str, str]] = None,
+        state: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Generate a response from the LLM.
+        context (earlier messages) and state (e.g. extracted_info) are fitted
+        into the token window by the context manager; neither is modified.
+        """
+        try:
+            return await self._complete(prompt, context, state)
+        except LLMUnavailable as e:
+            return f"Error: LLM unavailable, {e}"
         except Exception as e:
-            print(f"Error generating LLM response: {e}")
-            return f"Error: {str(e)}"
+            print(f"Error generating LLM response: {e!r}")
+            return f"Error: {str(e) or type(e).__name__}"
+    
+    async def warmup(self):
+        """
+        Load the model into memory with a long keep-alive, then run one
+        throwaway one-token completion so the first real request is warm.
+        Raises if Ollama is unreachable.
+        """
+        # Loading the model can legitimately outlast llm_timeout_seconds;
+        # this runs in the background warmup task, not a request
+        await get_ollama_client(None).generate(model=self.model, prompt="", keep_alive=settings.ollama_keep_alive)
+        await _probe_ollama()
     
     async def analyze_search_intent(self, search_params: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -54,7 +169,14 @@ class LLMClient:
         Keep it concise and helpful.
         """
         
-        response = await self.generate_response(prompt)
+        fallback = FALLBACK_TEMPLATES["search_intent"].format(
+            origin=search_params.get('origin'),
+            destination=search_params.get('destination'),
+            departure_date=search_params.get('departure_date'),
+            passengers=search_params.get('passengers') or 1,
+            cabin_class=search_params.get('cabin_class') or 'economy'
+        )
+        response = await self._complete_or_fallback(prompt, fallback)
         
         return {
             "analysis": response,
@@ -157,8 +279,19 @@ class LLMClient:
         Provide a helpful summary for the user.
         """
         
-        response = await self.generate_response(prompt)
-        return response
+        cheapest = min(flights, key=lambda f: f.get('price', 0))
+        fallback = FALLBACK_TEMPLATES["search_summary"].format(
+            count=len(flights),
+            currency=cheapest.get('currency', 'INR'),
+            min_price=cheapest.get('price', 0),
+            max_price=max(f.get('price', 0) for f in flights),
+            airlines=', '.join(sorted(set(f.get('airline', 'Unknown') for f in flights[:5]))),
+            cheapest_airline=cheapest.get('airline', ''),
+            cheapest_flight=cheapest.get('flight_number', ''),
+            cheapest_price=cheapest.get('price', 0),
+            cheapest_stops=cheapest.get('stops', 0)
+        )
+        return await self._complete_or_fallback(prompt, fallback)
     
     # New methods for conversational travel planning
     
@@ -218,9 +351,16 @@ class LLMClient:
             print(f"Error parsing LLM extraction: {e}, Response: {response}")
             return current_info
     
-    async def generate_next_question(self, extracted_info: Dict[str, Any]) -> str:
+    async def generate_next_question(
+        self,
+        extracted_info: Dict[str, Any],
+        history: Optional[List[Dict[str, str]]] = None,
+        state: Optional[Dict[str, Any]] = None
+    ) -> str:
         """
-        Generate the next question to ask based on what information is missing
+        Generate the next question to ask based on what information is missing.
+        Pass state (the conversation's extracted info) to send it once as the
+        compact state message instead of inside the prompt.
         """
         missing_fields = []
         if not extracted_info.get('destination'):
@@ -235,11 +375,12 @@ class LLMClient:
         if not missing_fields:
             return "Great! I have all the information. Let me create your travel plan!"
         
+        known_info = "see the known trip details above" if state else json.dumps(extracted_info, indent=2)
         prompt = f"""
         You are a friendly travel planning AI assistant. Generate a natural follow-up question.
         
         Information we have:
-        {json.dumps(extracted_info, indent=2)}
+        {known_info}
         
         Missing information: {', '.join(missing_fields)}
         
@@ -250,11 +391,14 @@ class LLMClient:
         4. interests (if missing)
         
         Keep it conversational and friendly. Don't ask for all missing info at once.
+        Don't repeat a question you already asked in the conversation.
         Response should be 1-2 sentences maximum.
         """
         
-        response = await self.generate_response(prompt)
-        return response.strip()
+        fallback = NEXT_QUESTION_TEMPLATES[missing_fields[0]].format(
+            destination=extracted_info.get('destination') or 'your destination'
+        )
+        return await self._complete_or_fallback(prompt, fallback, history, state)
     
     async def generate_travel_plan_summary(self, plan_details: Dict[str, Any]) -> str:
         """
@@ -274,5 +418,92 @@ class LLMClient:
         Make it enthusiastic and highlight key features!
         """
         
+        fallback = FALLBACK_TEMPLATES["plan_summary"].format(
+            days=plan_details['days'],
+            destination=plan_details['destination'],
+            total_cost=plan_details['total_cost'],
+            budget=plan_details['budget'],
+            airline=plan_details['flight'].get('airline', ''),
+            flight_number=plan_details['flight'].get('flight_number', ''),
+            hotel=plan_details['hotel'].get('name', ''),
+            rating=plan_details['hotel'].get('rating', 0),
+            interests=', '.join(plan_details.get('interests', [])) or 'sightseeing'
+        )
+        return await self._complete_or_fallback(prompt, fallback)
+    
+    async def generate_itinerary(self, destination: str, days: int, interests: List[str]) -> List[Dict[str, str]]:
+        """
+        Generate day-wise activities for a destination we have no templates for
+        """
+        prompt = f"""
+        Plan a {days}-day trip to {destination} for a traveler interested in: {', '.join(interests) or 'general sightseeing'}.
+        
+        Respond ONLY with a JSON array containing exactly {days} objects, one per day, in this format:
+        [
+            {{"morning": "activity", "afternoon": "activity", "evening": "activity"}}
+        ]
+        
+        Rules:
+        - Each activity is a short phrase (under 8 words) naming a real place or experience in {destination}
+        - Blend the interests across the days instead of focusing on one
+        - Return valid JSON only, no explanation
+        """
+        
         response = await self.generate_response(prompt)
-        return response.strip()
\ No newline at end of file
+        
+        try:
+            cleaned = response.strip()
+            if '```json' in cleaned:
+                cleaned = cleaned.split('```json')[1].split('```')[0].strip()
+            elif '```' in cleaned:
+                cleaned = cleaned.split('```')[1].split('```')[0].strip()
+            
+            days_plan = json.loads(cleaned)
+            
+            return [
+                {slot: str(day[slot]) for slot in ('morning', 'afternoon', 'evening')}
+                for day in days_plan[:days]
+            ]
+        except Exception as e:
+            print(f"Error parsing LLM itinerary: {e}, Response: {response}")
+            return []
+    
+    async def generate_comparison_summaries(self, plans: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Summarise several candidate plans in a single completion.
+        Returns summaries keyed by lower-cased destination.
+        """
+        if not plans:
+            return {}
+        
+        plan_lines = [
+            f"- {p['destination']}: {p['days']} days, total ₹{p['total_cost']}, "
+            f"flight {p['flight'].get('airline', '')} ({p['flight'].get('stops', 0)} stops), "
+            f"hotel {p['hotel'].get('name', '')} ({p['hotel'].get('rating', 0)}★)"
+            for p in plans
+        ]
+        
+        prompt = f"""
+        A traveler with a budget of ₹{plans[0]['budget']} interested in {', '.join(plans[0].get('interests', [])) or 'general sightseeing'} is comparing these trips:
+        {chr(10).join(plan_lines)}
+        
+        Write a brief, exciting 1-2 sentence summary for EACH destination highlighting what makes it a good fit.
+        
+        Respond ONLY with a JSON object mapping destination name to summary, for example:
+        {{"Goa": "summary", "Jaipur": "summary"}}
+        """
+        
+        response = await self.generate_response(prompt)
+        
+        try:
+            cleaned = response.strip()
+            if '```json' in cleaned:
+                cleaned = cleaned.split('```json')[1].split('```')[0].strip()
+            elif '```' in cleaned:
+                cleaned = cleaned.split('```')[1].split('```')[0].strip()
+            
+            summaries = json.loads(cleaned)
+            return {str(k).lower(): str(v).strip() for k, v in summaries.items()}
+        except Exception as e:
+            print(f"Error parsing LLM comparison summaries: {e}, Response: {response}")
+            return {}
@@ -0,0 +1,174 @@
+from typing import List, Dict, Any, Optional, Tuple
+
+# Share of the combined utility contributed by each side of the plan
+FLIGHT_WEIGHT = 0.4
+HOTEL_WEIGHT = 0.6
+
+# Utility of a flight by number of stops
+STOP_UTILITY = {0: 1.0, 1: 0.6}
+DEFAULT_STOP_UTILITY = 0.3
+
+# Hotel categories / amenities that satisfy each interest
+INTEREST_TAGS = {
+    'luxury': {'luxury', 'premium', 'Spa', 'Butler Service', 'Fine Dining'},
+    'relaxation': {'Spa', 'Pool', 'Beach Access', 'Garden', 'Sea View'},
+    'beach': {'Beach Access', 'Sea View'},
+    'food': {'Restaurant', 'Multiple Restaurants', 'Fine Dining', 'Heritage Dining'},
+    'culture': {'Heritage Property', 'Palace Hotel', 'Cultural Shows', 'Heritage Dining'},
+    'history': {'Heritage Property', 'Palace Hotel'},
+    'adventure': {'budget', 'Hostel', 'Common Area'},
+    'budget': {'budget', 'mid-range', 'Hostel'},
+    'backpacking': {'budget', 'Hostel', 'Common Kitchen'},
+    'business': {'Business Center', 'WiFi', 'Gym'},
+}
+
+# Share of the budget kept aside as a buffer when a plan fits inside it
+BUFFER_RATIO = 0.1
+
+
+class PlanOptimizer:
+    """
+    Picks the flight + hotel pair jointly instead of splitting the budget
+    into fixed per-side allowances.
+
+    Each side is reduced to its Pareto frontier (no other candidate is both
+    cheaper and better), then a two-pointer sweep over the two frontiers
+    finds the highest-utility pair under the budget in O(n log n).
+    """
+
+    def flight_utility(self, flight: Dict[str, Any]) -> float:
+        """Utility of a flight in [0, 1] from its number of stops"""
+        return STOP_UTILITY.get(flight.get('stops', 0), DEFAULT_STOP_UTILITY)
+
+    def hotel_utility(self, hotel: Dict[str, Any], interests: List[str]) -> float:
+        """Utility of a hotel in [0, 1] from its rating and interest match"""
+        rating_score = hotel.get('rating', 0) / 5.0
+        known = [i.lower() for i in interests if i.lower() in INTEREST_TAGS]
+        if not known:
+            return rating_score
+
+        tags = {hotel.get('category', '')} | set(hotel.get('amenities', []))
+        matched = sum(1 for interest in known if INTEREST_TAGS[interest] & tags)
+        return 0.7 * rating_score + 0.3 * (matched / len(known))
+
+    def pareto_frontier(self, items: List[Tuple[float, float, Any]]) -> List[Tuple[float, float, Any]]:
+        """
+        Reduce (cost, utility, payload) tuples to the non-dominated set,
+        ordered by increasing cost and strictly increasing utility
+        """
+        frontier = []
+        for cost, utility, payload in sorted(items, key=lambda x: (x[0], -x[1])):
+            if not frontier or utility > frontier[-1][1]:
+                frontier.append((cost, utility, payload))
+        return frontier
+
+    def _best_pair(
+        self,
+        flights: List[Tuple[float, float, Any]],
+        hotels: List[Tuple[float, float, Any]],
+        limit: float
+    ) -> Optional[Tuple[float, float, Any, Any]]:
+        """
+        Two-pointer sweep: flights by increasing cost leave less room for
+        the hotel, so the hotel pointer only ever moves left
+        """
+        best = None
+        h = len(hotels) - 1
+        for f_cost, f_utility, flight in flights:
+            while h >= 0 and f_cost + hotels[h][0] > limit:
+                h -= 1
+            if h < 0:
+                break
+            h_cost, h_utility, hotel = hotels[h]
+            utility = FLIGHT_WEIGHT * f_utility + HOTEL_WEIGHT * h_utility
+            total = f_cost + h_cost
+            if best is None or utility > best[1] or (utility == best[1] and total < best[0]):
+                best = (total, utility, flight, hotel)
+        return best
+
+    def joint_frontier(
+        self,
+        flights: List[Tuple[float, float, Any]],
+        hotels: List[Tuple[float, float, Any]]
+    ) -> List[Tuple[float, float, Tuple[Any, Any]]]:
+        """Pareto frontier of total cost vs. combined utility over both per-side frontiers"""
+        pairs = [
+            (f_cost + h_cost, FLIGHT_WEIGHT * f_utility + HOTEL_WEIGHT * h_utility, (flight, hotel))
+            for f_cost, f_utility, flight in flights
+            for h_cost, h_utility, hotel in hotels
+        ]
+        return self.pareto_frontier(pairs)
+
+    def optimize(
+        self,
+        flights: List[Dict[str, Any]],
+        hotels: List[Dict[str, Any]],
+        budget: float,
+        days: int,
+        passengers: int,
+        interests: List[str],
+        alternatives: int = 3
+    ) -> Dict[str, Any]:
+        """
+        Select the best flight + hotel combination for the budget.
+
+        Prefers plans that leave the buffer untouched, then plans that fit the
+        full budget, and falls back to the cheapest pair when nothing fits.
+        """
+        if not flights or not hotels:
+            return {
+                'flight': flights[0] if flights else {},
+                'hotel': hotels[0] if hotels else {},
+                'flight_cost': 0,
+                'hotel_cost': 0,
+                'total_cost': 0,
+                'utility': 0,
+                'within_budget': False,
+                'alternatives': []
+            }
+
+        flight_frontier = self.pareto_frontier([
+            (f['price'] * passengers * 2, self.flight_utility(f), f) for f in flights
+        ])
+        hotel_frontier = self.pareto_frontier([
+            (h['price_per_night'] * days, self.hotel_utility(h, interests), h) for h in hotels
+        ])
+
+        best = (
+            self._best_pair(flight_frontier, hotel_frontier, budget * (1 - BUFFER_RATIO))
+            or self._best_pair(flight_frontier, hotel_frontier, budget)
+        )
+        within_budget = best is not None
+        if best is None:
+            f_cost, f_utility, flight = flight_frontier[0]
+            h_cost, h_utility, hotel = hotel_frontier[0]
+            best = (f_cost + h_cost, FLIGHT_WEIGHT * f_utility + HOTEL_WEIGHT * h_utility, flight, hotel)
+
+        total_cost, utility, selected_flight, selected_hotel = best
+
+        # Next-best frontier plans that also fit the budget, most useful first
+        frontier = self.joint_frontier(flight_frontier, hotel_frontier)
+        others = [
+            point for point in frontier
+            if point[0] <= budget and point[2] != (selected_flight, selected_hotel)
+        ]
+        others.sort(key=lambda x: x[1], reverse=True)
+
+        return {
+            'flight': selected_flight,
+            'hotel': selected_hotel,
+            'flight_cost': selected_flight['price'] * passengers * 2,
+            'hotel_cost': selected_hotel['price_per_night'] * days,
+            'total_cost': total_cost,
+            'utility': round(utility, 4),
+            'within_budget': within_budget,
+            'alternatives': [
+                {
+                    'flight_id': flight['flight_id'],
+                    'hotel_id': hotel['hotel_id'],
+                    'total_cost': cost,
+                    'utility': round(point_utility, 4)
+                }
+                for cost, point_utility, (flight, hotel) in others[:alternatives]
+            ]
+        }
@@ -1,19 +1,43 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple, Callable, Awaitable
 from datetime import datetime, timedelta
 from app.services.flight_api import FlightAPI
 from app.services.hotel_api import HotelAPI
 from app.services.llm_client import LLMClient
+from app.services.plan_optimizer import PlanOptimizer
+from app.services.itinerary_engine import ItineraryEngine
+from app.services.booking_saga import SagaCoordinator
+from app.config import get_settings
+from collections import OrderedDict
+import asyncio
+import json
 import random
+import time
+
+settings = get_settings()
+
+# Passenger fields a group booking needs before reaching the supplier
+GROUP_REQUIRED_FIELDS = ('firstName', 'lastName', 'email')
 
 class TravelPlanner:
     def __init__(self):
         self.flight_api = FlightAPI()
         self.hotel_api = HotelAPI()
         self.llm = LLMClient()
+        self.optimizer = PlanOptimizer()
+        self.itinerary_engine = ItineraryEngine()
+        self.saga = SagaCoordinator(self.flight_api, self.hotel_api)
+        self._recent_searches: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
     
-    async def create_complete_plan(self, travel_info: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_complete_plan(
+        self,
+        travel_info: Dict[str, Any],
+        search_cache: Optional[Dict[str, asyncio.Future]] = None,
+        with_summary: bool = True
+    ) -> Dict[str, Any]:
         """
-        Create a complete travel plan with flights, hotels, and itinerary
+        Create a complete travel plan with flights, hotels, and itinerary.
+        Pass a shared search_cache to reuse identical searches across plans,
+        and with_summary=False when the caller summarises plans itself.
         """
         destination = travel_info.get('destination')
         origin = travel_info.get('origin', 'Delhi')
@@ -29,75 +53,51 @@ class TravelPlanner:
         
         return_date = (datetime.strptime(departure_date, '%Y-%m-%d') + timedelta(days=days)).strftime('%Y-%m-%d')
         
-        # Allocate budget (40% flights, 50% hotels, 10% buffer)
-        flight_budget = budget * 0.4
-        hotel_budget = budget * 0.5
-        hotel_budget_per_night = hotel_budget / days
-        
         # Search for flights
-        flight_search_params = {
-            'origin': origin,
-            'destination': destination,
-            'departure_date': departure_date,
-            'return_date': return_date,
-            'passengers': passengers,
-            'trip_type': 'round_trip',
-            'cabin_class': 'economy' if budget < 80000 else 'business'
-        }
+        flight_search_params = self._flight_search_params(origin, destination, departure_date, return_date, passengers, budget)
         
-        flights = await self.flight_api.search_flights(flight_search_params)
-        
-        # Filter flights within budget
-        affordable_flights = [f for f in flights if f.price * passengers * 2 <= flight_budget]
-        if not affordable_flights:
-            affordable_flights = sorted(flights, key=lambda x: x.price)[:3]
-        
-        # Select best flight using LLM
-        selected_flight = await self._select_best_option(
-            [f.dict() for f in affordable_flights],
-            'flight',
-            interests,
-            flight_budget
+        flights = await self._cached_search(
+            search_cache, 'flights', flight_search_params, self.flight_api.search_flights, settings.plan_search_max_age_seconds
         )
         
         # Search for hotels
-        hotel_search_params = {
-            'destination': destination.lower(),
-            'budget_per_night': hotel_budget_per_night,
-            'interests': interests,
-            'check_in': departure_date,
-            'check_out': return_date
-        }
+        hotel_search_params = self._hotel_search_params(destination, departure_date, return_date, budget, days, interests)
         
-        hotels = await self.hotel_api.search_hotels(hotel_search_params)
+        hotels = await self._cached_search(
+            search_cache, 'hotels', hotel_search_params, self.hotel_api.search_hotels, settings.plan_search_max_age_seconds
+        )
         
-        # Select best hotel using LLM
-        selected_hotel = await self._select_best_option(
+        # Pick flight and hotel jointly under the budget
+        selection = self.optimizer.optimize(
+            [f.dict() for f in flights],
             hotels,
-            'hotel',
-            interests,
-            hotel_budget_per_night
+            budget,
+            days,
+            passengers,
+            interests
         )
+        selected_flight = selection['flight']
+        selected_hotel = selection['hotel']
         
         # Calculate costs
-        flight_cost = selected_flight['price'] * passengers * 2  # Round trip
-        hotel_cost = selected_hotel['price_per_night'] * days
-        total_cost = flight_cost + hotel_cost
+        total_cost = selection['total_cost']
         remaining_budget = budget - total_cost
         
         # Generate day-wise itinerary
-        itinerary = await self._generate_itinerary(destination, days, interests)
+        itinerary = await self.itinerary_engine.generate(destination, days, interests)
         
         # Generate summary
-        summary = await self.llm.generate_travel_plan_summary({
-            'destination': destination,
-            'days': days,
-            'budget': budget,
-            'total_cost': total_cost,
-            'flight': selected_flight,
-            'hotel': selected_hotel,
-            'interests': interests
-        })
+        summary = ''
+        if with_summary:
+            summary = await self.llm.generate_travel_plan_summary({
+                'destination': destination,
+                'days': days,
+                'budget': budget,
+                'total_cost': total_cost,
+                'flight': selected_flight,
+                'hotel': selected_hotel,
+                'interests': interests
+            })
         
         return {
             'destination': destination,
@@ -113,111 +113,380 @@ class TravelPlanner:
             'hotel': selected_hotel,
             'itinerary': itinerary,
             'summary': summary,
-            'interests': interests
+            'interests': interests,
+            'alternatives': selection['alternatives']
         }
     
-    async def _select_best_option(self, options: List[Dict], option_type: str, interests: List[str], budget: float) -> Dict[str, Any]:
-        """
-        Use LLM to select best option based on interests and budget
-        """
-        if not options:
-            return {}
-        
-        if option_type == 'flight':
-            # For flights, return the first one (already sorted by price)
-            return options[0]
-        else:
-            # For hotels, use interest-based selection
-            if 'luxury' in interests or 'relaxation' in interests:
-                # Prefer higher rated hotels
-                return sorted(options, key=lambda x: x['rating'], reverse=True)[0]
-            elif 'budget' in interests or 'adventure' in interests:
-                # Prefer cheaper hotels
-                return sorted(options, key=lambda x: x['price_per_night'])[0]
-            else:
-                # Balance of price and rating
-                return options[0]
+    def _flight_search_params(self, origin: str, destination: str, departure_date: str, return_date: str, passengers: int, budget: float) -> Dict[str, Any]:
+        """Round-trip flight search parameters for a plan"""
+        return {
+            'origin': origin,
+            'destination': destination,
+            'departure_date': departure_date,
+            'return_date': return_date,
+            'passengers': passengers,
+            'trip_type': 'round_trip',
+            'cabin_class': 'economy' if budget < 80000 else 'business'
+        }
     
-    async def _generate_itinerary(self, destination: str, days: int, interests: List[str]) -> List[Dict[str, Any]]:
-        """
-        Generate day-wise itinerary based on destination and interests
-        """
-        # Mock itinerary templates
-        itinerary_templates = {
-            'goa': {
-                'relaxation': [
-                    {'morning': 'Beach yoga and meditation', 'afternoon': 'Spa treatment', 'evening': 'Sunset at beach'},
-                    {'morning': 'Leisure breakfast', 'afternoon': 'Pool relaxation', 'evening': 'Beach dinner'},
-                    {'morning': 'Beach walk', 'afternoon': 'Water sports', 'evening': 'Local seafood dinner'}
-                ],
-                'adventure': [
-                    {'morning': 'Scuba diving', 'afternoon': 'Jet skiing', 'evening': 'Beach party'},
-                    {'morning': 'Parasailing', 'afternoon': 'Island hopping', 'evening': 'Night market'},
-                    {'morning': 'Kayaking', 'afternoon': 'Snorkeling', 'evening': 'Seafood shack'}
-                ],
-                'food': [
-                    {'morning': 'Goan breakfast tour', 'afternoon': 'Spice plantation visit', 'evening': 'Fine dining'},
-                    {'morning': 'Local market exploration', 'afternoon': 'Cooking class', 'evening': 'Beach shack dinner'},
-                    {'morning': 'Café hopping', 'afternoon': 'Vineyard tour', 'evening': 'Traditional Goan feast'}
-                ]
-            },
-            'default': [
-                {'morning': 'City tour and sightseeing', 'afternoon': 'Local attractions', 'evening': 'Traditional dinner'},
-                {'morning': 'Cultural exploration', 'afternoon': 'Shopping and leisure', 'evening': 'Local entertainment'},
-                {'morning': 'Day trip to nearby attraction', 'afternoon': 'Return and relax', 'evening': 'Farewell dinner'}
-            ]
+    def _hotel_search_params(self, destination: str, check_in: str, check_out: str, budget: float, days: int, interests: List[str]) -> Dict[str, Any]:
+        """
+        Hotel search parameters for a plan - the whole budget bounds the
+        nightly rate so the optimizer sees every candidate that could still fit
+        """
+        return {
+            'destination': destination.lower(),
+            'budget_per_night': budget / days,
+            'interests': interests,
+            'check_in': check_in,
+            'check_out': check_out
         }
+    
+    async def _cached_search(
+        self,
+        search_cache: Optional[Dict[str, asyncio.Future]],
+        kind: str,
+        params: Dict[str, Any],
+        search_fn: Callable[[Dict[str, Any]], Awaitable[Any]],
+        max_age: float
+    ) -> Any:
+        """
+        Run a search once per identical parameter set.
+        The in-flight task is shared through search_cache so concurrent
+        callers in a batch make one call. Results are also kept process-wide
+        (up to search_cache_ttl_seconds) and reused when younger than max_age:
+        re-plans accept the full TTL, new plans only plan_search_max_age_seconds
+        so their prices stay fresh.
+        """
+        key = f"{kind}:{json.dumps(params, sort_keys=True, default=str)}"
+        
+        recent = self._recent_searches.get(key)
+        if recent and time.monotonic() - recent[0] < min(max_age, settings.search_cache_ttl_seconds):
+            self._recent_searches.move_to_end(key)
+            return recent[1]
+        
+        if search_cache is None:
+            search_cache = {}
+        if key not in search_cache:
+            search_cache[key] = asyncio.ensure_future(search_fn(params))
+        result = await search_cache[key]
+        
+        self._recent_searches[key] = (time.monotonic(), result)
+        self._recent_searches.move_to_end(key)
+        while len(self._recent_searches) > settings.search_cache_max_entries:
+            self._recent_searches.popitem(last=False)
+        
+        return result
+    
+    async def prime_flight_searches(self, routes: List[Tuple[str, str]], days: int = 3) -> int:
+        """
+        Warm the recent-search cache with the round trip a default plan
+        searches (departure in 14 days, one economy passenger) for each route
+        """
+        departure_date = (datetime.now() + timedelta(days=14)).strftime('%Y-%m-%d')
+        return_date = (datetime.now() + timedelta(days=14 + days)).strftime('%Y-%m-%d')
+        await asyncio.gather(*[
+            self._cached_search(
+                None,
+                'flights',
+                self._flight_search_params(origin, destination, departure_date, return_date, 1, 0),
+                self.flight_api.search_flights,
+                settings.plan_search_max_age_seconds
+            )
+            for origin, destination in routes
+        ])
+        return len(routes)
+    
+    async def create_batch_plans(
+        self,
+        travel_infos: List[Dict[str, Any]],
+        max_concurrency: int,
+        search_cache: Optional[Dict[str, asyncio.Future]] = None
+    ) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        Plan many trips at once, yielding (index, plan, error) as each finishes.
+        Identical requests share one plan and identical searches run once.
+        """
+        search_cache = {} if search_cache is None else search_cache
+        plan_cache: Dict[str, asyncio.Future] = {}
+        semaphore = asyncio.Semaphore(max_concurrency)
         
-        # Select appropriate template
-        dest_lower = destination.lower()
-        interest_key = interests[0] if interests else 'relaxation'
+        async def plan_one(travel_info: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.create_complete_plan(travel_info, search_cache)
         
-        if dest_lower in itinerary_templates:
-            templates = itinerary_templates[dest_lower].get(interest_key, itinerary_templates['default'])
-        else:
-            templates = itinerary_templates['default']
+        async def run(index: int, travel_info: Dict[str, Any]):
+            key = json.dumps(travel_info, sort_keys=True, default=str)
+            if key not in plan_cache:
+                plan_cache[key] = asyncio.ensure_future(plan_one(travel_info))
+            try:
+                return index, await plan_cache[key], None
+            except Exception as e:
+                return index, None, str(e)
         
-        # Generate itinerary for each day
-        itinerary = []
-        for day in range(1, days + 1):
-            template_index = (day - 1) % len(templates)
-            day_plan = templates[template_index]
+        tasks = [asyncio.ensure_future(run(i, info)) for i, info in enumerate(travel_infos)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
+            for future in list(search_cache.values()) + list(plan_cache.values()):
+                future.cancel()
+    
+    async def replan(self, plan: Dict[str, Any], changes: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Update a stored plan for a parameter delta, recomputing only what the
+        delta invalidates: flights for a date change, the hotel for a budget
+        change, the itinerary for an interest or duration change.
+        Returns the new plan and the list of recomputed parts.
+        """
+        changes = {k: v for k, v in changes.items() if v is not None and v != plan.get(k)}
+        updated = {**plan, **changes}
+        
+        destination = updated['destination']
+        budget = updated['budget']
+        days = updated['days']
+        interests = updated['interests']
+        passengers = updated['passengers']
+        departure_date = updated['departure_date']
+        return_date = (datetime.strptime(departure_date, '%Y-%m-%d') + timedelta(days=days)).strftime('%Y-%m-%d')
+        
+        dates_changed = 'departure_date' in changes or 'days' in changes
+        cabin_changed = (plan['budget'] < 80000) != (budget < 80000)
+        flight_invalidated = dates_changed or cabin_changed
+        hotel_invalidated = 'budget' in changes
+        recomputed = []
+        
+        flights = [plan['flight']]
+        if flight_invalidated:
+            flight_search_params = self._flight_search_params(updated['origin'], destination, departure_date, return_date, passengers, budget)
+            found = await self._cached_search(
+                None, 'flights', flight_search_params, self.flight_api.search_flights, settings.search_cache_ttl_seconds
+            )
+            flights = [f.dict() for f in found]
+            recomputed.append('flight')
+        
+        hotels = [plan['hotel']]
+        if hotel_invalidated:
+            hotel_search_params = self._hotel_search_params(destination, departure_date, return_date, budget, days, interests)
+            hotels = await self._cached_search(
+                None, 'hotels', hotel_search_params, self.hotel_api.search_hotels, settings.search_cache_ttl_seconds
+            )
+            recomputed.append('hotel')
+        
+        selection = self.optimizer.optimize(flights, hotels, budget, days, passengers, interests)
+        selected_flight = selection['flight']
+        selected_hotel = selection['hotel']
+        if dates_changed and not hotel_invalidated:
+            selected_hotel = {**selected_hotel, 'check_in': departure_date, 'check_out': return_date}
+        
+        itinerary = plan['itinerary']
+        if 'interests' in changes or 'days' in changes:
+            itinerary = await self.itinerary_engine.generate(destination, days, interests)
+            recomputed.append('itinerary')
+        
+        summary = plan['summary']
+        if selected_flight.get('flight_id') != plan['flight'].get('flight_id') or selected_hotel.get('hotel_id') != plan['hotel'].get('hotel_id'):
+            summary = await self.llm.generate_travel_plan_summary({
+                'destination': destination,
+                'days': days,
+                'budget': budget,
+                'total_cost': selection['total_cost'],
+                'flight': selected_flight,
+                'hotel': selected_hotel,
+                'interests': interests
+            })
+            recomputed.append('summary')
+        
+        new_plan = {
+            **updated,
+            'departure_date': departure_date,
+            'return_date': return_date,
+            'total_cost': selection['total_cost'],
+            'remaining_budget': budget - selection['total_cost'],
+            'flight': selected_flight,
+            'hotel': selected_hotel,
+            'itinerary': itinerary,
+            'summary': summary,
+            'alternatives': selection['alternatives'] if flight_invalidated or hotel_invalidated else plan.get('alternatives', [])
+        }
+        return new_plan, recomputed
+    
+    async def compare_destinations(
+        self,
+        travel_info: Dict[str, Any],
+        destinations: List[str]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+        """
+        Plan the same trip to several destinations concurrently and rank them
+        on cost and interest fit. All summaries come from one LLM call.
+        A destination whose searches fail or find nothing is reported in the
+        second list instead of failing the whole comparison.
+        Returns (ranked candidates, failures).
+        """
+        budget = travel_info.get('budget', 50000)
+        interests = travel_info.get('interests', [])
+        
+        # Fix the departure date once so every candidate is planned for the same dates
+        shared_info = {**travel_info}
+        if not shared_info.get('departure_date'):
+            shared_info['departure_date'] = (datetime.now() + timedelta(days=14)).strftime('%Y-%m-%d')
+        
+        unique_destinations = list(dict.fromkeys(d.strip() for d in destinations if d.strip()))
+        outcomes = await asyncio.gather(*[
+            self.create_complete_plan({**shared_info, 'destination': destination}, with_summary=False)
+            for destination in unique_destinations
+        ], return_exceptions=True)
+        
+        plans = []
+        failures = []
+        for destination, outcome in zip(unique_destinations, outcomes):
+            if isinstance(outcome, Exception):
+                failures.append({'destination': destination, 'error': str(outcome) or type(outcome).__name__})
+            elif not outcome['flight'] or not outcome['hotel']:
+                missing = 'flights' if not outcome['flight'] else 'hotels'
+                failures.append({'destination': destination, 'error': f"No {missing} found"})
+            else:
+                plans.append(outcome)
+        
+        if not plans:
+            return [], failures
+        
+        summaries = await self.llm.generate_comparison_summaries(plans)
+        
+        candidates = []
+        for plan in plans:
+            plan['summary'] = summaries.get(plan['destination'].lower()) or self._comparison_fallback_summary(plan)
             
-            itinerary.append({
-                'day': day,
-                'title': f'Day {day} - {destination}',
-                'activities': day_plan
+            cost_score = max(0.0, 1 - plan['total_cost'] / budget) if budget else 0.0
+            interest_fit = (
+                self.itinerary_engine.interest_coverage(plan['destination'], interests)
+                + self.optimizer.hotel_utility(plan['hotel'], interests)
+            ) / 2
+            candidates.append({
+                'destination': plan['destination'],
+                'score': round(0.5 * cost_score + 0.5 * interest_fit, 4),
+                'cost_score': round(cost_score, 4),
+                'interest_fit': round(interest_fit, 4),
+                'plan': plan
             })
         
-        return itinerary
+        candidates.sort(key=lambda c: c['score'], reverse=True)
+        for rank, candidate in enumerate(candidates, start=1):
+            candidate['rank'] = rank
+        
+        return candidates, failures
+    
+    def _comparison_fallback_summary(self, plan: Dict[str, Any]) -> str:
+        """One-line summary used when the batched LLM summary is missing"""
+        return (
+            f"{plan['days']} days in {plan['destination']} for ₹{plan['total_cost']:,.0f}, "
+            f"staying at {plan['hotel'].get('name', 'a local hotel')} and flying "
+            f"{plan['flight'].get('airline', 'economy')}."
+        )
     
     async def book_complete_plan(self, plan: Dict[str, Any], passenger_details: Dict[str, Any]) -> Dict[str, Any]:
         """
         Book both flight and hotel from the plan
         """
-        # Book flight
-        flight_booking = await self.flight_api.book_flight(
-            plan['flight']['flight_id'],
-            passenger_details
-        )
+        result = await self.saga.book_plan(plan, passenger_details)
         
-        # Book hotel
-        hotel_booking_details = {
-            **passenger_details,
-            'check_in': plan['departure_date'],
-            'check_out': plan['return_date'],
-            'total_amount': plan['hotel']['price_per_night'] * plan['days']
-        }
-        
-        hotel_booking = await self.hotel_api.book_hotel(
-            plan['hotel']['hotel_id'],
-            hotel_booking_details
-        )
+        if result['status'] != 'success':
+            return {
+                **result,
+                'total_cost': plan['total_cost']
+            }
         
         return {
-            'status': 'success',
-            'flight_booking': flight_booking,
-            'hotel_booking': hotel_booking,
+            **result,
             'total_cost': plan['total_cost'],
             'message': f"Complete travel plan booked successfully! Total cost: ₹{plan['total_cost']}"
-        }
\ No newline at end of file
+        }
+    
+    async def book_group(
+        self,
+        flight_id: str,
+        passengers: List[Dict[str, Any]],
+        hotel_id: Optional[str] = None,
+        hotel_details: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Book one flight (and optionally one hotel) for many passengers.
+        Seats are reserved in one supplier batch and rooms through
+        HotelAPI.book_hotel_batch; passengers missing required details fail
+        individually without blocking the rest. A passenger is confirmed
+        only when every requested leg is; legs that succeeded for a
+        passenger who ends up failed are cancelled.
+        Returns one result per passenger, in request order.
+        """
+        results: List[Dict[str, Any]] = []
+        valid = []
+        for index, passenger in enumerate(passengers):
+            missing = [field for field in GROUP_REQUIRED_FIELDS if not passenger.get(field)]
+            if missing:
+                results.append({'index': index, 'status': 'failed', 'message': f"Missing {', '.join(missing)}"})
+            else:
+                results.append({'index': index, 'status': 'pending'})
+                valid.append(index)
+        
+        if not valid:
+            return results
+        
+        valid_passengers = [passengers[i] for i in valid]
+        batches = [self.flight_api.book_flight_batch(flight_id, valid_passengers)]
+        if hotel_id:
+            batches.append(self.hotel_api.book_hotel_batch(hotel_id, valid_passengers, hotel_details or {}))
+        
+        batch_results = await asyncio.gather(*batches, return_exceptions=True)
+        errors = [r for r in batch_results if isinstance(r, Exception)]
+        if errors:
+            # One batch failed: release whatever the other one reserved
+            await self.cancel_group_legs(
+                [] if isinstance(batch_results[0], Exception) else batch_results[0],
+                [] if not hotel_id or isinstance(batch_results[1], Exception) else batch_results[1]
+            )
+            for i in valid:
+                results[i] = {'index': i, 'status': 'failed', 'message': f"Supplier error: {errors[0]}"}
+            return results
+        
+        flight_results = batch_results[0]
+        hotel_results = batch_results[1] if hotel_id else [None] * len(valid)
+        for i, flight_booking, hotel_booking in zip(valid, flight_results, hotel_results):
+            if flight_booking.get('status') != 'confirmed':
+                # No seat, so the passenger's room must not be kept either
+                await self.cancel_group_legs([], [hotel_booking])
+                results[i] = {'index': i, 'status': 'failed', 'message': flight_booking.get('message', 'Seat not confirmed')}
+                continue
+            if hotel_id and (hotel_booking or {}).get('status') != 'confirmed':
+                # A room was requested but not confirmed: release the seat too
+                await self.cancel_group_legs([flight_booking], [])
+                results[i] = {'index': i, 'status': 'failed', 'message': (hotel_booking or {}).get('message', 'Room not confirmed')}
+                continue
+            results[i] = {
+                'index': i,
+                'status': 'confirmed',
+                'flight_booking': flight_booking,
+                'hotel_booking': hotel_booking
+            }
+        
+        return results
+    
+    async def cancel_group_legs(
+        self,
+        flight_bookings: List[Optional[Dict[str, Any]]],
+        hotel_bookings: List[Optional[Dict[str, Any]]]
+    ):
+        """
+        Cancel confirmed group legs. Best effort: a failed cancellation is
+        logged and the rest are still attempted.
+        """
+        cancellations = [
+            api.cancel_booking(booking['booking_id'])
+            for api, bookings in ((self.flight_api, flight_bookings), (self.hotel_api, hotel_bookings))
+            for booking in bookings
+            if booking and booking.get('status') == 'confirmed'
+        ]
+        for outcome in await asyncio.gather(*cancellations, return_exceptions=True):
+            if isinstance(outcome, Exception):
+                print(f"Group booking cancellation failed: {outcome}")
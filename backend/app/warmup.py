@@ -0,0 +1,94 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import func, select, text
+from app.config import get_settings
+from app.database import AsyncSessionLocal, async_engine, engine
+from app.db_models import SearchHistory
+
+settings = get_settings()
+
+class Warmup:
+    """
+    Work done once per worker before it takes traffic: load the Ollama model,
+    open database connections and prime caches for the busiest routes.
+    Readiness (/api/ready) reports ready only once this has finished.
+    """
+
+    def __init__(self):
+        self.status = "pending"  # 'pending', 'warming', 'ready', 'failed'
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.started_at: float = None
+        self.finished_at: float = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    async def _step(self, name: str, coro) -> bool:
+        started = time.perf_counter()
+        try:
+            result = await coro
+            self.steps[name] = {"ok": True, "result": result}
+        except Exception as e:
+            self.steps[name] = {"ok": False, "error": str(e)}
+            print(f"Warmup step '{name}' failed: {e}")
+        self.steps[name]["seconds"] = round(time.perf_counter() - started, 3)
+        return self.steps[name]["ok"]
+
+    async def _prepare_db_pool(self) -> int:
+        """Open pooled connections up front so the first requests don't pay for them"""
+        async def touch():
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        count = max(1, min(settings.warmup_db_connections, settings.db_pool_size))
+        await asyncio.gather(*[touch() for _ in range(count)])
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return count
+
+    async def _top_routes(self, limit: int) -> List[Tuple[str, str]]:
+        """Most searched routes of the last 30 days"""
+        since = datetime.utcnow() - timedelta(days=30)
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(SearchHistory.origin, SearchHistory.destination)
+                .where(SearchHistory.created_at >= since)
+                .group_by(SearchHistory.origin, SearchHistory.destination)
+                .order_by(func.count().desc())
+                .limit(limit)
+            )).all()
+        return [(origin, destination) for origin, destination in rows if origin and destination]
+
+    async def _prime_caches(self, travel_planner) -> Dict[str, int]:
+        routes = await self._top_routes(settings.warmup_prime_routes)
+        if not routes:
+            return {"routes": 0, "flight_searches": 0, "itineraries": 0}
+        itineraries = await travel_planner.itinerary_engine.prime([d for _, d in routes])
+        searches = await travel_planner.prime_flight_searches(routes)
+        return {"routes": len(routes), "flight_searches": searches, "itineraries": itineraries}
+
+    async def run(self, travel_planner):
+        """Run every step; a failed step is recorded and the rest still run"""
+        self.status = "warming"
+        self.started_at = time.time()
+
+        await self._step("database", self._prepare_db_pool())
+        llm_ok = await self._step("llm", travel_planner.llm.warmup())
+        if settings.warmup_prime_routes > 0:
+            await self._step("caches", self._prime_caches(travel_planner))
+
+        self.finished_at = time.time()
+        self.status = "ready" if llm_ok or not settings.warmup_require_llm else "failed"
+        print(f"Warmup finished in {self.finished_at - self.started_at:.1f}s: {self.status}")
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "steps": self.steps,
+            "seconds": round(self.finished_at - self.started_at, 3) if self.finished_at else None,
+        }
+
+warmup = Warmup()
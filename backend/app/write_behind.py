@@ -0,0 +1,153 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Tuple, Type
+from sqlalchemy import insert
+from app.config import get_settings
+from app.database import SessionLocal, Base
+
+settings = get_settings()
+
+class WriteBehindQueue:
+    """
+    Buffers analytics-grade rows (e.g. SearchHistory) and writes them in
+    batched transactions from a background task, off the request path.
+    Bookings and other rows that must be durable on return are written
+    synchronously by their routes instead.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_queue: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: asyncio.Task = None
+        self._flushing: asyncio.Future = None
+        self.stats = {
+            "enqueued": 0,
+            "flushed": 0,
+            "failed": 0,
+            "overflow_writes": 0,
+            "flushes": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    def start(self):
+        """Start the background flusher (call from app startup)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write everything still queued (call from app shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushing is not None:
+            await self._flushing
+
+        remaining = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        for i in range(0, len(remaining), self.batch_size):
+            await asyncio.to_thread(self._write, remaining[i:i + self.batch_size])
+
+    async def enqueue(self, model: Type[Base], row: Dict[str, Any]):
+        """
+        Queue a row for a later batched insert. When the queue is full the
+        row is written right away in a worker thread, so nothing is lost
+        under overload and the event loop is never blocked on the write.
+        """
+        try:
+            self._queue.put_nowait((model, row))
+            self.stats["enqueued"] += 1
+        except asyncio.QueueFull:
+            self.stats["overflow_writes"] += 1
+            await asyncio.to_thread(self._write, [(model, row)])
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            try:
+                while len(batch) < self.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Hand the partial batch back for stop() to write
+                for item in batch:
+                    self._queue.put_nowait(item)
+                raise
+            # Shielded so a shutdown mid-flush lets the write finish; stop() awaits it
+            self._flushing = asyncio.ensure_future(asyncio.to_thread(self._write, batch))
+            await asyncio.shield(self._flushing)
+
+    def _write(self, batch: List[Tuple[Type[Base], Dict[str, Any]]]):
+        """
+        Insert a batch in one transaction, one bulk statement per table.
+        If the batch fails it is retried row by row, so a bad row only
+        loses itself.
+        """
+        started = time.perf_counter()
+        try:
+            self._insert(batch)
+            self.stats["flushed"] += len(batch)
+        except Exception as e:
+            print(f"Write-behind flush of {len(batch)} rows failed, retrying row by row: {e}")
+            for item in batch:
+                try:
+                    self._insert([item])
+                    self.stats["flushed"] += 1
+                except Exception as row_error:
+                    self.stats["failed"] += 1
+                    print(f"Write-behind dropped a {item[0].__tablename__} row: {row_error}")
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats["flushes"] += 1
+        self.stats["last_flush_ms"] = round(elapsed_ms, 3)
+        self.stats["max_flush_ms"] = round(max(self.stats["max_flush_ms"], elapsed_ms), 3)
+        self.stats["total_flush_ms"] += elapsed_ms
+
+    def _insert(self, batch: List[Tuple[Type[Base], Dict[str, Any]]]):
+        by_model: Dict[Type[Base], List[Dict[str, Any]]] = {}
+        for model, row in batch:
+            by_model.setdefault(model, []).append(row)
+
+        with SessionLocal() as db:
+            try:
+                for model, rows in by_model.items():
+                    db.execute(insert(model), rows)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth and flush latency for monitoring"""
+        flushes = self.stats["flushes"]
+        return {
+            "queue_depth": self._queue.qsize(),
+            "enqueued": self.stats["enqueued"],
+            "flushed": self.stats["flushed"],
+            "failed": self.stats["failed"],
+            "overflow_writes": self.stats["overflow_writes"],
+            "flushes": flushes,
+            "last_flush_ms": self.stats["last_flush_ms"],
+            "max_flush_ms": self.stats["max_flush_ms"],
+            "avg_flush_ms": round(self.stats["total_flush_ms"] / flushes, 3) if flushes else 0.0,
+        }
+
+write_behind = WriteBehindQueue(
+    settings.write_behind_batch_size,
+    settings.write_behind_flush_interval,
+    settings.write_behind_max_queue
+)
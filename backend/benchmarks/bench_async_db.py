@@ -0,0 +1,137 @@
+"""
+Throughput of sync vs async DB sessions under mixed load.
+
+Runs concurrent "history" requests (count + page query on search_history)
+alongside "LLM-bound" requests (an awaited sleep standing in for an Ollama
+completion) and reports requests/sec and LLM-request latency for:
+  - sync:  blocking SessionLocal queries on the event loop (old routes)
+  - async: AsyncSession queries via aiosqlite (current routes)
+
+Usage (from backend/):
+    python -m benchmarks.bench_async_db --rows 200000 --requests 400
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.db_models import SearchHistory
+
+def seed(url: str, rows: int):
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    start = datetime.utcnow() - timedelta(days=365)
+    with engine.begin() as conn:
+        batch = []
+        for i in range(rows):
+            batch.append({
+                "search_id": f"s{i}",
+                "origin": "Delhi",
+                "destination": ("Goa", "Jaipur", "Mumbai", "Bangalore")[i % 4],
+                "departure_date": "2026-12-01",
+                "passengers": 1,
+                "trip_type": "one_way",
+                "cabin_class": "economy",
+                "result_count": 10,
+                "search_status": "success",
+                "created_at": start + timedelta(seconds=i * 30),
+            })
+            if len(batch) == 10000:
+                conn.execute(insert(SearchHistory), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(SearchHistory), batch)
+    engine.dispose()
+
+def history_query():
+    query = select(SearchHistory).where(SearchHistory.destination == "Goa")
+    return (
+        select(func.count()).select_from(query.subquery()),
+        query.order_by(SearchHistory.created_at.desc()).limit(20),
+    )
+
+async def run(mode: str, url: str, requests: int, llm_share: float, llm_latency: float):
+    count_query, page_query = history_query()
+    llm_latencies = []
+
+    if mode == "sync":
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        Session = sessionmaker(bind=engine)
+
+        async def db_request():
+            with Session() as db:
+                db.scalar(count_query)
+                db.execute(page_query).scalars().all()
+    else:
+        engine = create_async_engine(url.replace("sqlite:", "sqlite+aiosqlite:", 1))
+        Session = async_sessionmaker(engine)
+
+        async def db_request():
+            async with Session() as db:
+                await db.scalar(count_query)
+                (await db.execute(page_query)).scalars().all()
+
+    async def llm_request():
+        started = time.perf_counter()
+        await asyncio.sleep(llm_latency)
+        llm_latencies.append(time.perf_counter() - started)
+
+    every = max(1, round(1 / llm_share)) if llm_share else 0
+    jobs = [llm_request() if every and i % every == 0 else db_request() for i in range(requests)]
+
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(64)
+
+    async def bounded(job):
+        async with semaphore:
+            await job
+
+    await asyncio.gather(*(bounded(job) for job in jobs))
+    elapsed = time.perf_counter() - started
+
+    if mode == "sync":
+        engine.dispose()
+    else:
+        await engine.dispose()
+
+    llm_latencies.sort()
+    return {
+        "mode": mode,
+        "req_per_sec": round(requests / elapsed, 1),
+        "llm_p50_ms": round(statistics.median(llm_latencies) * 1000, 1) if llm_latencies else 0,
+        "llm_p95_ms": round(llm_latencies[int(len(llm_latencies) * 0.95) - 1] * 1000, 1) if llm_latencies else 0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--llm-share", type=float, default=0.5, help="fraction of requests that are LLM-bound")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="simulated completion time in seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        print(f"Seeding {args.rows} search_history rows...")
+        seed(url, args.rows)
+
+        for mode in ("sync", "async"):
+            result = asyncio.run(run(mode, url, args.requests, args.llm_share, args.llm_latency))
+            print(
+                f"{result['mode']:>5}: {result['req_per_sec']:>8} req/s   "
+                f"LLM-request latency p50 {result['llm_p50_ms']} ms, p95 {result['llm_p95_ms']} ms"
+            )
+
+if __name__ == "__main__":
+    main()
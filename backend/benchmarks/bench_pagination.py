@@ -0,0 +1,112 @@
+"""
+Latency of /api/history-style page loads as search_history grows.
+
+For each table size it times a page near the end of the table, loaded:
+  - offset: COUNT(*) + OFFSET paging + one bookings query per search (old route)
+  - keyset: cursor seek on (created_at, id) + one batched bookings query,
+            no total (count=none)
+
+Usage (from backend/):
+    python -m benchmarks.bench_pagination --sizes 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import Base
+from app.db_models import Booking, SearchHistory
+from app.pagination import encode_cursor, fetch_page
+
+PAGE = 20
+
+def seed(url: str, rows: int):
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    start = datetime.utcnow() - timedelta(days=365)
+    with engine.begin() as conn:
+        searches, bookings = [], []
+        for i in range(rows):
+            searches.append({
+                "search_id": f"s{i}",
+                "origin": "Delhi",
+                "destination": "Goa",
+                "departure_date": "2026-12-01",
+                "passengers": 1,
+                "search_status": "success",
+                "created_at": start + timedelta(seconds=i),
+            })
+            if i % 5 == 0:
+                bookings.append({"booking_id": f"b{i}", "search_id": f"s{i}", "status": "confirmed", "total_amount": 5000.0, "created_at": start + timedelta(seconds=i)})
+            if len(searches) == 20000:
+                conn.execute(insert(SearchHistory), searches)
+                conn.execute(insert(Booking), bookings)
+                searches, bookings = [], []
+        if searches:
+            conn.execute(insert(SearchHistory), searches)
+        if bookings:
+            conn.execute(insert(Booking), bookings)
+    engine.dispose()
+
+async def time_it(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+async def bench(url: str, rows: int):
+    engine = create_async_engine(url.replace("sqlite:", "sqlite+aiosqlite:", 1))
+    Session = async_sessionmaker(engine)
+    depth = int(rows * 0.9)
+
+    async with Session() as db:
+        anchor = (await db.execute(
+            select(SearchHistory).order_by(SearchHistory.created_at.desc(), SearchHistory.id.desc()).offset(depth - 1).limit(1)
+        )).scalars().first()
+        cursor = encode_cursor(anchor.created_at, anchor.id)
+
+        async def offset_page():
+            query = select(SearchHistory)
+            await db.scalar(select(func.count()).select_from(query.subquery()))
+            searches = (await db.execute(
+                query.order_by(SearchHistory.created_at.desc()).offset(depth).limit(PAGE)
+            )).scalars().all()
+            for search in searches:
+                (await db.execute(select(Booking).where(Booking.search_id == search.search_id))).scalars().all()
+
+        async def keyset_page():
+            searches, _ = await fetch_page(db, select(SearchHistory), SearchHistory, PAGE, cursor=cursor)
+            ids = [s.search_id for s in searches]
+            (await db.execute(select(Booking).where(Booking.search_id.in_(ids)))).scalars().all()
+
+        offset_ms = await time_it(offset_page)
+        keyset_ms = await time_it(keyset_page)
+
+    await engine.dispose()
+    return offset_ms, keyset_ms
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 500000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'offset+count+N+1':>18} {'keyset+batched':>16}")
+    for rows in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            seed(url, rows)
+            offset_ms, keyset_ms = asyncio.run(bench(url, rows))
+            print(f"{rows:>10} {offset_ms:>15.2f} ms {keyset_ms:>13.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Response size and serialization cost of the main result payloads.
+
+For each endpoint a representative payload is built from the mock flight
+and hotel services, then:
+  - bytes: raw JSON, gzip and brotli (as CompressionMiddleware sends them)
+  - encode: stdlib json.dumps(jsonable_encoder(...)) - the old path - against
+            FastJSONResponse (orjson), which renders every route: dicts as
+            returned, response_model output after pydantic's JSON-mode dump
+search-and-book is also sized in its old shape, with selected_flight
+repeated next to all_flights.
+
+Before measuring, every API route must resolve to FastJSONResponse and a
+real request must render through it; otherwise this exits non-zero.
+
+Usage (from backend/):
+    python -m benchmarks.bench_payloads --runs 2000 --page 100
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.models import AutonomousBookingResponse, SearchResponse, TravelPlan
+from app.responses import FastJSONResponse
+from app.services.flight_api import FlightAPI
+from app.services.hotel_api import HotelAPI
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+settings = get_settings()
+
+SEARCH_PARAMS = {
+    "origin": "Delhi",
+    "destination": "Goa",
+    "departure_date": "2026-12-01",
+    "passengers": 2,
+    "cabin_class": "economy",
+}
+
+def thoughts(count: int):
+    return [
+        {"step": i, "thought": f"Reasoning step {i} about the {SEARCH_PARAMS['destination']} search",
+         "action": "search_flights", "timestamp": datetime.utcnow().isoformat()}
+        for i in range(1, count + 1)
+    ]
+
+async def build_payloads(page: int):
+    flights = [f.model_dump() for f in await FlightAPI().search_flights(SEARCH_PARAMS)]
+    hotels = await HotelAPI().search_hotels({"destination": "goa", "budget_per_night": 8000})
+    now = datetime.utcnow()
+
+    search = SearchResponse(
+        search_id="search_0001", status="completed", thoughts=thoughts(4),
+        flights=flights, message="Found 10 flights from Delhi to Goa.", search_params=SEARCH_PARAMS
+    )
+    selected = flights[3]
+    booking_result = {"booking_id": "BK12345678", "status": "confirmed", "confirmation_code": "ABC123", "flight_details": selected}
+    search_and_book = AutonomousBookingResponse(
+        search_id="search_0002", status="completed", thoughts=thoughts(6), all_flights=flights,
+        selected_flight_index=3, selected_flight_id=selected["flight_id"],
+        selection_reason="Cheapest non-stop option in the morning", booking_result=booking_result,
+        message="Booked the best flight."
+    )
+    # Old shape: the selected flight repeated in full next to all_flights
+    old_search_and_book = {
+        **search_and_book.model_dump(exclude={"selected_flight_index", "selected_flight_id"}),
+        "selected_flight": selected
+    }
+    plan = TravelPlan(
+        destination="Goa", origin="Delhi", departure_date="2026-12-01", return_date="2026-12-06",
+        days=5, passengers=2, budget=80000, total_cost=61234.5, remaining_budget=18765.5,
+        flight=selected, hotel=hotels[0],
+        itinerary=[
+            {"day": d, "title": f"Day {d} in Goa",
+             "activities": {"morning": "Beach walk and breakfast", "afternoon": "Old Goa churches", "evening": "Sunset cruise"}}
+            for d in range(1, 6)
+        ],
+        summary="A relaxed five days of beaches, food and heritage. " * 4,
+        interests=["beaches", "food", "heritage"],
+        alternatives=[{"flight": f, "hotel": h} for f, h in zip(flights[:3], hotels[1:4])]
+    )
+    history = {
+        "total": page * 10, "limit": page, "offset": 0, "next_cursor": "eyJjIjogIjIwMjYifQ",
+        "items": [
+            {"search_id": f"search_{i:06d}", "origin": "Delhi", "destination": "Goa",
+             "departure_date": "2026-12-01", "return_date": None, "passengers": 2, "cabin_class": "economy",
+             "result_count": 10, "search_status": "completed",
+             "created_at": (now - timedelta(minutes=i)).isoformat(),
+             "bookings": [{"booking_id": f"BK{i:08d}", "confirmation_code": "ABC123", "status": "confirmed", "total_amount": 4321.0}]}
+            for i in range(page)
+        ]
+    }
+    bookings = {
+        "total": page * 10, "limit": page, "offset": 0, "next_cursor": "eyJjIjogIjIwMjYifQ",
+        "items": [
+            {"booking_id": f"BK{i:08d}", "booking_type": "flight", "passenger_name": "Asha Rao",
+             "passenger_email": "asha@example.com", "flight_details": flights[i % len(flights)], "hotel_details": None,
+             "total_amount": 4321.0, "currency": "INR", "status": "confirmed", "confirmation_code": "ABC123",
+             "created_at": (now - timedelta(minutes=i)).isoformat()}
+            for i in range(page)
+        ]
+    }
+    return [
+        ("POST /api/search", search, None),
+        ("POST /api/search-and-book", search_and_book, old_search_and_book),
+        ("POST /api/plan-travel", plan, None),
+        (f"GET /api/history ({page}/page)", history, None),
+        (f"GET /api/bookings ({page}/page)", bookings, None),
+    ]
+
+def old_encode(payload) -> bytes:
+    return json.dumps(jsonable_encoder(payload)).encode()
+
+def new_encode(payload) -> bytes:
+    if hasattr(payload, "model_dump"):
+        payload = payload.model_dump(mode="json")
+    return FastJSONResponse(payload).body
+
+def check_response_class() -> bool:
+    """Every route resolves to FastJSONResponse, and a request really renders through it"""
+    from app.main import app
+
+    wrong = [
+        route.path for route in app.routes
+        if isinstance(route, APIRoute) and route.response_class is not FastJSONResponse
+    ]
+    if wrong:
+        print(f"FAIL: routes not using FastJSONResponse: {', '.join(wrong)}")
+        return False
+
+    rendered = []
+    render = FastJSONResponse.render
+    FastJSONResponse.render = lambda self, content: rendered.append(content) or render(self, content)
+    try:
+        TestClient(app).get("/api/health")
+    finally:
+        FastJSONResponse.render = render
+    if not rendered:
+        print("FAIL: /api/health was not rendered by FastJSONResponse")
+        return False
+    return True
+
+def time_us(fn, payload, runs: int) -> float:
+    started = time.perf_counter()
+    for _ in range(runs):
+        fn(payload)
+    return (time.perf_counter() - started) / runs * 1e6
+
+def sizes(body: bytes):
+    gz = len(gzip.compress(body, settings.compression_gzip_level))
+    br = len(brotli.compress(body, quality=settings.compression_brotli_quality)) if brotli else None
+    return len(body), gz, br
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--page", type=int, default=100, help="items per history / bookings page")
+    args = parser.parse_args()
+
+    if not check_response_class():
+        sys.exit(1)
+    payloads = asyncio.run(build_payloads(args.page))
+
+    print(f"{'endpoint':<30} {'raw B':>8} {'gzip B':>8} {'br B':>8} {'old us':>9} {'new us':>9} {'speedup':>8}")
+    for name, payload, old_shape in payloads:
+        raw, gz, br = sizes(new_encode(payload))
+        old_us = time_us(old_encode, payload, args.runs)
+        new_us = time_us(new_encode, payload, args.runs)
+        print(f"{name:<30} {raw:>8} {gz:>8} {br if br is not None else '-':>8} {old_us:>9.1f} {new_us:>9.1f} {old_us / new_us:>7.1f}x")
+        if old_shape is not None:
+            old_raw, old_gz, old_br = sizes(new_encode(old_shape))
+            print(f"{'  (old shape)':<30} {old_raw:>8} {old_gz:>8} {old_br if old_br is not None else '-':>8}")
+
+if __name__ == "__main__":
+    main()
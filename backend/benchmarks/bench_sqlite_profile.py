@@ -0,0 +1,114 @@
+"""
+Mixed read/write throughput of the 'baseline' vs 'production' storage profile.
+
+Writer threads insert bookings one transaction at a time (like /api/book)
+while reader threads load /api/bookings?status=confirmed pages. Baseline is
+SQLite's defaults (rollback journal, FULL sync, no composite indexes);
+production applies the STORAGE_PROFILES pragmas and the composite indexes.
+
+Usage (from backend/):
+    python -m benchmarks.bench_sqlite_profile --seconds 10 --writers 4 --readers 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+
+from app.database import Base, STORAGE_PROFILES, apply_sqlite_pragmas
+from app.db_models import Booking
+
+SEED_ROWS = 200000
+PAGE = 20
+
+def seed(engine, profile: str):
+    Base.metadata.create_all(bind=engine)
+    if profile == "baseline":
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX IF EXISTS ix_bookings_status_created")
+    start = datetime.utcnow() - timedelta(days=365)
+    statuses = ["confirmed", "cancelled", "pending"]
+    with engine.begin() as conn:
+        conn.execute(insert(Booking), [
+            {
+                "booking_id": f"b{i}",
+                "status": statuses[i % 3],
+                "total_amount": 5000.0,
+                "created_at": start + timedelta(seconds=i),
+            }
+            for i in range(SEED_ROWS)
+        ])
+
+def run(profile: str, seconds: float, writers: int, readers: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            connect_args={"check_same_thread": False},
+            pool_size=writers + readers
+        )
+        apply_sqlite_pragmas(engine, STORAGE_PROFILES[profile])
+        seed(engine, profile)
+
+        counts = {"writes": 0, "reads": 0, "errors": 0}
+        lock = threading.Lock()
+        stop_at = time.perf_counter() + seconds
+
+        def writer():
+            while time.perf_counter() < stop_at:
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(insert(Booking).values(
+                            booking_id=uuid.uuid4().hex, status="confirmed",
+                            total_amount=1.0, created_at=datetime.utcnow()
+                        ))
+                    key = "writes"
+                except OperationalError:
+                    key = "errors"
+                with lock:
+                    counts[key] += 1
+
+        def reader():
+            query = (select(Booking).where(Booking.status == "confirmed")
+                     .order_by(Booking.created_at.desc(), Booking.id.desc()).limit(PAGE))
+            while time.perf_counter() < stop_at:
+                try:
+                    with engine.connect() as conn:
+                        conn.execute(query).all()
+                    key = "reads"
+                except OperationalError:
+                    key = "errors"
+                with lock:
+                    counts[key] += 1
+
+        threads = [threading.Thread(target=writer) for _ in range(writers)]
+        threads += [threading.Thread(target=reader) for _ in range(readers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        engine.dispose()
+
+    return {k: v / seconds for k, v in counts.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'profile':>10} {'writes/s':>10} {'reads/s':>10} {'errors/s':>10}")
+    for profile in ("baseline", "production"):
+        result = run(profile, args.seconds, args.writers, args.readers)
+        print(f"{profile:>10} {result['writes']:>10.1f} {result['reads']:>10.1f} {result['errors']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
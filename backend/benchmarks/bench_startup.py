@@ -0,0 +1,105 @@
+"""
+Cold-start cost of a worker: time to import app.main in a fresh interpreter.
+
+Each run is a new process. The wall-clock import time (median of --runs)
+is checked against --max-ms, and modules that must stay deferred until
+first use (ollama, jose, passlib, the service stack) must not be loaded at
+import. Either regression exits non-zero, so this can gate CI.
+A per-package breakdown from `python -X importtime` shows where the time goes.
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup --runs 7 --max-ms 1000
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imported on first use only - see llm_client.py, auth.py and routes.get_*()
+DEFERRED_MODULES = [
+    "ollama",
+    "jose",
+    "passlib",
+    "app.services.agent",
+    "app.services.travel_planner",
+    "app.services.llm_client",
+]
+
+PROBE = """
+import sys, time
+started = time.perf_counter()
+import app.main
+elapsed = (time.perf_counter() - started) * 1000
+print(elapsed)
+print(",".join(m for m in {deferred!r} if m in sys.modules))
+"""
+
+def run_python(args):
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+def measure_wall(runs: int):
+    times, loaded = [], set()
+    for _ in range(runs):
+        out = run_python(["-c", PROBE.format(deferred=DEFERRED_MODULES)]).stdout.splitlines()
+        times.append(float(out[0]))
+        loaded.update(m for m in out[1].split(",") if m)
+    return times, loaded
+
+def measure_breakdown(runs: int):
+    """Median self time (ms) per top-level package, app.* modules kept separate"""
+    totals = defaultdict(list)
+    for _ in range(runs):
+        per_run = defaultdict(float)
+        stderr = run_python(["-X", "importtime", "-c", "import app.main"]).stderr
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            parts = line[len("import time:"):].split("|")
+            if not parts[0].strip().isdigit():
+                continue
+            name = parts[2].strip()
+            key = name if name.startswith("app.") else name.split(".")[0]
+            per_run[key] += int(parts[0]) / 1000
+        for key, value in per_run.items():
+            totals[key].append(value)
+    return {key: statistics.median(values) for key, values in totals.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--max-ms", type=float, default=1000, help="fail when the median import exceeds this")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    breakdown = measure_breakdown(max(1, args.runs // 2))
+    print(f"{'module / package':<36} {'self ms':>9}")
+    for name, ms in sorted(breakdown.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<36} {ms:>9.1f}")
+
+    times, loaded = measure_wall(args.runs)
+    median = statistics.median(times)
+    print(f"\nimport app.main: median {median:.0f} ms, min {min(times):.0f} ms, max {max(times):.0f} ms over {args.runs} runs")
+
+    failed = False
+    if median > args.max_ms:
+        print(f"FAIL: median import time {median:.0f} ms exceeds {args.max_ms:.0f} ms")
+        failed = True
+    if loaded:
+        print(f"FAIL: deferred modules imported at startup: {', '.join(sorted(loaded))}")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
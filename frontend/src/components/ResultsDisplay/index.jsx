@@ -13,7 +13,8 @@ const ResultsDisplay = ({ searchResponse, autonomousBookingResponse, onBook }) =
 
   // Handle autonomous booking results
   if (autonomousBookingResponse) {
-    const { selected_flight, booking_result, selection_reason, all_flights } = autonomousBookingResponse;
+    const { selected_flight_index, booking_result, selection_reason, all_flights } = autonomousBookingResponse;
+    const selected_flight = all_flights[selected_flight_index];
     
     return (
       <div className="results-display autonomous-results">
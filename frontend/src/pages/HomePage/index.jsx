@@ -14,6 +14,7 @@ const HomePage = () => {
   ]);
   const [isLoading, setIsLoading] = useState(false);
   const [extractedInfo, setExtractedInfo] = useState({});
+  const [conversationId, setConversationId] = useState(null);
   const [isReadyToPlan, setIsReadyToPlan] = useState(false);
   const [travelPlan, setTravelPlan] = useState(null);
   const [isGeneratingPlan, setIsGeneratingPlan] = useState(false);
@@ -30,11 +31,12 @@ const HomePage = () => {
     setIsLoading(true);
 
     try {
+      // History is kept server-side; only the new message is sent
       const response = await chatWithAgent({
         message: userMessage,
-        conversation_history: messages,
-        extracted_info: extractedInfo
+        conversation_id: conversationId
       });
+      setConversationId(response.conversation_id);
 
       // Add AI response to chat
       const aiMessage = {
@@ -44,7 +46,7 @@ const HomePage = () => {
       };
 
       setMessages(prev => [...prev, aiMessage]);
-      setExtractedInfo(response.extracted_info);
+      setExtractedInfo(prev => ({ ...prev, ...response.extracted_info_delta }));
       setIsReadyToPlan(response.is_ready_to_plan);
 
     } catch (error) {
@@ -38,9 +38,10 @@ const SearchPage = () => {
     try {
       const response = await searchAndBookAutonomous(searchParams, passengerDetails);
       setAutonomousBookingResponse(response);
+      const selectedFlight = response.all_flights[response.selected_flight_index];
       
       // Show success notification
-      alert(`🎉 AI has successfully booked your flight!\n\nConfirmation Code: ${response.booking_result.confirmation_code}\n\nFlight: ${response.selected_flight.airline} ${response.selected_flight.flight_number}\n\nCheck your email for details!`);
+      alert(`🎉 AI has successfully booked your flight!\n\nConfirmation Code: ${response.booking_result.confirmation_code}\n\nFlight: ${selectedFlight.airline} ${selectedFlight.flight_number}\n\nCheck your email for details!`);
     } catch (error) {
       console.error('Autonomous booking error:', error);
       alert('Error during autonomous booking. Please try again or use manual search.');